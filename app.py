@@ -1,14 +1,24 @@
+import time
 import streamlit as st
-from streamlit_chat import message
-import google.generativeai as genai
-import base64
-from pathlib import Path
-import folium
-from streamlit_folium import folium_static
-import requests
-from geopy.geocoders import Nominatim
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import streamlit.components.v1 as components
+import hmac
 import json
-from streamlit_js_eval import get_geolocation
+import gemini_client
+from assets import image_url, style_tag
+from caching import make_cache
+from context_window import build_context_window
+from recommendation import RESPONSE_SCHEMA, STRUCTURED_OUTPUT_INSTRUCTION, extract_partial_reply, parse_response, to_model_text
+from response_cache import ResponseCache
+from menu_text import extract_menus
+from prefetch import Prefetcher
+from model_gate import ModelGate, ModelThrottled
+from maps import MAP_HEIGHT, build_folium_map, build_pydeck_map, render_map_html
+from metrics import metrics
+from session_memory import ChatMessage, SessionRegistry, deep_size, trim_history
+
+# 모델 클라이언트, 지도, 역지오코딩, 음식점 검색, 영양 분석처럼 무거운 의존성(grpc, folium,
+# geopy, requests, pandas 등)은 처음 필요할 때 아래 get_* 함수 안에서 불러와 첫 화면 표시를 앞당김
 
 # 상수 정의
 SYSTEM_ROLE = """당신은 친근하고 편안한 영양 전문가이자 식단 컨설턴트입니다. 
@@ -33,8 +43,8 @@ SYSTEM_ROLE = """당신은 친근하고 편안한 영양 전문가이자 식단
   • 마지막에 건강 상태와 관련된 간단한 한 줄 조언 추가
     예시) "고혈압이 있으신 경우 된장찌개는 조금 싱겁게 드시는 게 좋아요 😊"
     예시) "빈혈이 있으시니 시금치는 레몬즙을 뿌려 드시면 철분 흡수가 더 잘될 거예요 👍"
-  • 추천 메뉴를 명확하게 구분하여 응답 마지막에 "추천메뉴:"로 시작하는 새로운 줄에 메뉴 이름만 작성
-    예시) "추천메뉴: 된장찌개"
+  • 가장 추천하는 메뉴의 이름만 recommended_menu 필드에 따로 작성
+    예시) "된장찌개"
 
 주의사항:
 - 절대로 사용자가 언급하지 않은 메뉴는 추천하지 않기
@@ -46,35 +56,73 @@ SYSTEM_ROLE = """당신은 친근하고 편안한 영양 전문가이자 식단
 PAGE_ICON = "🐽"
 PAGE_TITLE = "헬핏잇 - 부족한 영양소를 채우는 메뉴 추천 AI"
 MODEL_NAME = "gemini-1.5-flash"
+STREAM_RESPONSES = True  # 응답을 토큰 단위로 스트리밍하여 표시
+
+# Gemini 호출 제한 (프로세스 전체 기준)
+GEMINI_REQUESTS_PER_MINUTE = 60
+GEMINI_BURST = 10  # 한 번에 몰려도 바로 보낼 수 있는 요청 수
+GEMINI_MAX_CONCURRENT = 8  # 동시에 진행할 수 있는 모델 호출 수
+GEMINI_MAX_QUEUED = 32  # 실행을 기다릴 수 있는 요청 수
+GEMINI_QUEUE_TIMEOUT = 30  # 대기열에서 기다리는 최대 시간 (초)
+
+# 1단계 식사 분석 응답 캐시 (같은 건강 상태와 메뉴 조합이면 모델 호출 없이 재사용)
+MEAL_ANALYSIS_CACHE_ENABLED = True
+MEAL_ANALYSIS_CACHE_MAXSIZE = 256
+MEAL_ANALYSIS_CACHE_TTL = 6 * 60 * 60  # 응답 유지 시간 (초)
+
+# 대화 창 설정 (최근 턴만 그대로 보내고 이전 턴은 요약)
+CONTEXT_KEEP_TURNS = 4  # 그대로 보낼 최근 대화 턴 수 (사용자 + AI 메시지 1쌍이 1턴)
+CONTEXT_TOKEN_BUDGET = 6000  # 시스템 역할을 포함한 프롬프트 토큰 예산 (추정치)
+
+# 채팅 표시 방식: "native" (st.chat_message), "legacy" (streamlit_chat iframe 컴포넌트)
+CHAT_RENDER_MODE = "native"
+CHAT_PAGE_SIZE = 20  # 처음에 보여줄 최근 메시지 수 (이전 메시지는 접어 둠)
+THROTTLED_MESSAGE = "⏳ 지금 요청이 많아 답변을 시작하지 못했어요. 잠시 후 다시 보내주세요."
+
+# 주변 음식점 검색 설정
+PLACES_NEARBY_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+PLACES_LANGUAGE = 'ko'
+PLACES_RESULT_LIMIT = 5  # 지도와 목록에 보여줄 음식점 수
+PLACES_CACHE_MAXSIZE = 512  # 캐시에 보관할 최대 검색 결과 수 (메뉴/위치/반경 조합 단위)
+PLACES_CACHE_TTL = 600  # 검색 결과 유지 시간 (초)
+PLACES_CACHE_GRID = 0.005  # 위치 반올림 격자 크기 (위경도, 약 500m)
+PREFETCH_WORKERS = 4  # 후보 메뉴 음식점 검색을 미리 실행할 작업 스레드 수
+PREFETCH_MAX_PENDING = 32  # 프로세스 전체에서 동시에 미리 실행할 수 있는 검색 수
+PREFETCH_MAX_MENUS = 5  # 메시지 하나에서 미리 검색할 최대 후보 메뉴 수
+
+# 위치 정보 설정
+GEOCODE_DB_PATH = ".cache/geocode.sqlite3"  # 역지오코딩 결과 디스크 저장소 (None이면 메모리만 사용)
+ADDRESS_POLL_INTERVAL = 1  # 주소 조회 완료 확인 주기 (초)
+
+# 지도 렌더링 방식: "folium" (캐시된 HTML), "st_folium" (고정 key 컴포넌트), "pydeck" (가벼운 점 레이어)
+MAP_RENDERER = "folium"
 
-def get_base64_of_bin_file(bin_file):
-    """이미지 파일을 base64로 인코딩"""
-    with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+# 세션 메모리 설정
+SESSION_MAX_TURNS = 50  # 세션에 보관할 최대 대화 턴 수 (오래된 턴부터 삭제)
+SESSION_IDLE_TIMEOUT = 30 * 60  # 이 시간 동안 재실행이 없는 세션의 파생 캐시 정리 (초)
+SESSION_SWEEP_INTERVAL = 60  # 유휴 세션 확인 주기 (초)
+
+# 계측 패널 설정 (secrets.toml의 METRICS_ADMIN_TOKEN과 같은 ?admin= 값으로 접속하면 사이드바에 표시)
+METRICS_ADMIN_TOKEN_KEY = "METRICS_ADMIN_TOKEN"
 
 def set_background(png_file):
-    """배경 이미지 설정"""
-    bin_str = get_base64_of_bin_file(png_file)
-    page_bg_img = f'''
-    <style>
+    """배경 이미지 설정 (최적화된 이미지를 정적 파일 또는 data URI로 사용)"""
+    bin_url = image_url(png_file, static_serving=st.get_option("server.enableStaticServing"))
+    st.markdown(style_tag(f'''
     .stApp {{
-        background-image: url("data:image/png;base64,{bin_str}");
+        background-image: url("{bin_url}");
         background-size: 90%;
         background-position: center;
         background-repeat: no-repeat;
         background-attachment: fixed;
         background-color: #fff5f5;  /* 연한 분홍빛 배경색 */
     }}
-    </style>
-    '''
-    st.markdown(page_bg_img, unsafe_allow_html=True)
+    '''), unsafe_allow_html=True)
 
 def setup_page_style():
     """페이지 스타일 설정"""
     st.markdown(
-        """
-        <style>
+        style_tag("""
         /* 최상단 헤더 스타일 */
         header[data-testid="stHeader"],
         .st-emotion-cache-18ni7ap,
@@ -215,8 +263,7 @@ def setup_page_style():
         button[kind="header"] {
             background-color: transparent !important;
         }
-        </style>
-        """,
+        """),
         unsafe_allow_html=True
     )
 
@@ -226,7 +273,11 @@ def initialize_session_state():
         'chat_history': [],
         'active_role': SYSTEM_ROLE,
         'health_condition': None,
-        'last_recommended_menu': None  # 마지막 추천 메뉴 저장
+        'last_recommended_menu': None,  # 마지막 추천 메뉴 저장
+        'pending_response': None,  # 생성 중인 응답 (재실행으로 중단돼도 이어서 표시)
+        'notice': None,  # 다음 실행에서 한 번 보여줄 안내 메시지
+        'chat_pages': 1,  # 펼쳐 보여줄 채팅 페이지 수
+        'nutrient_gaps': []  # 로컬 영양 분석으로 찾은 부족 영양소
     }
     
     for key, value in default_values.items():
@@ -245,8 +296,7 @@ def initialize_gemini():
             st.error("❌ Gemini API 키가 비어 있습니다. 유효한 API 키를 입력해주세요.")
             return False
 
-        # Gemini 설정
-        genai.configure(api_key=st.secrets['GEMINI_API_KEY'])
+        # 클라이언트 설정은 첫 메시지에서 모델을 만들 때 한 번만 수행
         return True
 
     except Exception as e:
@@ -270,51 +320,343 @@ def initialize_google_maps():
         st.error(f"❌ Google Maps API 키 검증 중 오류가 발생했습니다: {str(e)}")
         return False
 
-def get_gemini_response(messages):
-    """Gemini 모델을 사용하여 응답을 생성하는 함수"""
+@st.cache_resource
+def get_gemini_model():
+    """Gemini 모델 인스턴스 생성 (프로세스당 1회, 시스템 역할은 system instruction, 응답은 JSON 스키마)"""
+    return gemini_client.create_model(
+        st.secrets['GEMINI_API_KEY'],
+        MODEL_NAME,
+        SYSTEM_ROLE + STRUCTURED_OUTPUT_INSTRUCTION,
+        RESPONSE_SCHEMA
+    )
+
+def get_context_window(messages, prompt=None):
+    """모델에 보낼 대화 창 생성 (최근 턴 + 이전 대화 요약)
+
+    토큰 예산은 모델에 실제로 보내는 system instruction과 이번 턴 프롬프트 기준
+    """
+    return build_context_window(
+        messages,
+        st.session_state['health_condition'],
+        SYSTEM_ROLE + STRUCTURED_OUTPUT_INSTRUCTION,
+        keep_turns=CONTEXT_KEEP_TURNS,
+        token_budget=CONTEXT_TOKEN_BUDGET,
+        model_text=to_model_text,
+        prompt=prompt
+    )
+
+@st.cache_resource
+def get_session_registry():
+    """세션별 파생 캐시와 메모리 사용량 기록 (유휴 세션은 주기적으로 정리)"""
+    return SessionRegistry(idle_timeout=SESSION_IDLE_TIMEOUT, sweep_interval=SESSION_SWEEP_INTERVAL)
+
+def get_session_id():
+    """현재 스크립트 실행의 세션 ID"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+def get_session_cache():
+    """현재 세션의 파생 캐시 (정리된 값은 필요할 때 채팅 기록에서 다시 만듦)"""
+    return get_session_registry().derived(get_session_id())
+
+def limit_session_memory():
+    """저장 턴 수를 제한하고 세션 상태 메모리 사용량 기록"""
+    removed = trim_history(st.session_state['chat_history'], SESSION_MAX_TURNS)
+    cache = get_session_cache()
+    if removed and 'gemini_chat_start' in cache:
+        # 대화 세션 시작 인덱스를 남은 기록 기준으로 맞춤 (지워진 범위였으면 다음 턴에 재구성)
+        cache['gemini_chat_start'] -= removed
+    get_session_registry().record_size(get_session_id(), deep_size(st.session_state.to_dict()))
+
+def get_chat_session(window):
+    """세션 파생 캐시에 보관된 Gemini 대화 세션 반환 (없거나 대화 창과 어긋나면 재구성)"""
+    history = window.history()
+    cache = get_session_cache()
+    chat = cache.get('gemini_chat')
     try:
-        # 모델 인스턴스 생성
-        model = genai.GenerativeModel(MODEL_NAME)
-        chat = model.start_chat(history=[])
-        
-        # 시스템 역할 설정
-        try:
-            chat.send_message(SYSTEM_ROLE)
-        except Exception as e:
-            st.warning(f"⚠️ 역할 설정 중 오류가 발생했습니다: {str(e)}")
-        
-        # 대화 기록 전달
-        for msg in messages:
-            if msg["is_user"]:
-                try:
-                    chat.send_message(msg["content"])
-                except Exception as e:
-                    st.warning(f"⚠️ 대화 기록 처리 중 오류가 발생했습니다: {str(e)}")
-                    continue
-        
-        # 응답 생성
+        in_sync = (
+            chat is not None
+            and cache.get('gemini_chat_start') == window.start
+            and len(chat.history) == len(history)
+        )
+    except Exception:
+        # 스트림이 중간에 끊긴 세션은 기록을 읽을 수 없음
+        in_sync = False
+    if not in_sync:
+        # 재구성은 로컬 작업이며 모델 요청을 보내지 않음
+        chat = get_gemini_model().start_chat(history=history)
+        cache['gemini_chat'] = chat
+        cache['gemini_chat_start'] = window.start
+    return chat
+
+@st.cache_resource
+def get_model_gate():
+    """Gemini 호출 제한기 (프로세스 내 모든 세션이 공유)"""
+    gate = ModelGate(
+        rate=GEMINI_REQUESTS_PER_MINUTE / 60,
+        burst=GEMINI_BURST,
+        max_concurrent=GEMINI_MAX_CONCURRENT,
+        max_queued=GEMINI_MAX_QUEUED,
+        queue_timeout=GEMINI_QUEUE_TIMEOUT
+    )
+    metrics.register_counters("gemini", gate.stats)
+    return gate
+
+def get_chunk_text(chunk):
+    """스트리밍 청크의 텍스트 추출 (텍스트가 없는 청크는 빈 문자열)"""
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+@metrics.timed("gemini.generate")
+def generate_gemini_response(model, chat, history, content, pending):
+    """Gemini 응답 생성 (작업 스레드에서 실행되며 생성된 텍스트를 pending에 누적)"""
+    if STREAM_RESPONSES:
+        started = time.perf_counter()
         try:
-            response = chat.send_message(messages[-1]["content"])
-            return response.text
-        except Exception as e:
-            st.error("❌ 답변 생성 중 오류가 발생했습니다.")
-            st.error(f"상세 오류: {str(e)}")
-            return "죄송합니다. 답변을 생성하는 중에 문제가 발생했습니다. 다시 시도해 주세요."
-        
+            for chunk in chat.send_message(content, stream=True):
+                text = get_chunk_text(chunk)
+                if text and not pending.text:
+                    metrics.observe("gemini.first_chunk", time.perf_counter() - started)
+                pending.append(text)
+            if pending.text:
+                return
+        except Exception:
+            metrics.error("gemini.stream")
+        # 스트림이 중간에 끊기면 새 대화 세션에서 일반 요청으로 다시 생성
+        pending.reset()
+        chat = model.start_chat(history=history)
+    pending.append(chat.send_message(content).text)
+
+def start_gemini_response(messages, window, prompt):
+    """응답 생성 시작 (같은 세션에서 같은 메시지로 진행 중인 요청이 있으면 재사용)
+
+    prompt는 마지막 사용자 메시지에 참고 정보를 덧붙여 모델에 실제로 보낼 텍스트
+    """
+    content = messages[-1].content
+    # 이전 실행이 중단되며 남긴 같은 메시지의 응답 (이미 완료됐을 수도 있음)
+    pending = st.session_state.get('pending_response')
+    if pending is not None and pending.content == content:
+        return pending
+    
+    key = (get_session_id(), len(messages), content)
+    gate = get_model_gate()
+    pending = gate.find(key)
+    if pending is None:
+        model = get_gemini_model()
+        chat = get_chat_session(window)
+        history = window.history()
+        pending = gate.submit(
+            key,
+            content,
+            lambda pending: generate_gemini_response(model, chat, history, prompt, pending)
+        )
+    return pending
+
+def display_pending_response(pending, placeholder):
+    """생성 중인 응답의 답변 부분을 placeholder에 점진적으로 표시하고 완료되면 원문 반환"""
+    version = -1
+    shown_state = None
+    while not pending.done:
+        version = pending.wait(version, timeout=0.5)
+        reply = extract_partial_reply(pending.text)
+        if reply:
+            placeholder.markdown(reply + "▌", unsafe_allow_html=True)
+        elif shown_state != pending.queued:
+            shown_state = pending.queued
+            with placeholder.container():
+                if pending.queued:
+                    custom_spinner("요청이 많아 순서를 기다리고 있어요...")
+                else:
+                    custom_spinner()
+    
+    if pending.error is not None:
+        raise pending.error
+    return pending.text
+
+@st.cache_resource
+def get_food_index():
+    """음식 영양 성분표 색인 (프로세스당 1회 로드)"""
+    from nutrition import FoodIndex
+
+    return FoodIndex.load()
+
+def build_user_prompt(messages):
+    """모델에 보낼 사용자 메시지 생성
+
+    첫 식사 분석이면 로컬 영양 추정치를, 메뉴 추천 단계에서 로컬 순위가 있으면
+    그 결과를 함께 보내 모델은 설명만 작성하도록 함
+    """
+    content = messages[-1].content
+    ranking = messages[-1].menu_ranking
+    if ranking:
+        return (
+            f"[로컬 추천 - 건강 상태: {st.session_state['health_condition']}, "
+            f"점수 순: {' > '.join(ranking)}. "
+            f"{ranking[0]}을(를) recommended_menu로 추천하고 이유를 친근하게 설명해 주세요]\n\n{content}"
+        )
+    if len(messages) != 1:
+        return content
+    report = get_food_index().analyze(extract_menus(content))
+    if not report.matched:
+        return content
+    # 메뉴 추천 단계에서 사용할 부족 영양소
+    st.session_state['nutrient_gaps'] = report.deficient
+    return f"{report.to_prompt()}\n\n{content}"
+
+@st.cache_resource
+def get_menu_scorer():
+    """건강 상태별 메뉴 채점기 (프로세스당 1회 생성)"""
+    from menu_scoring import MenuScorer
+
+    return MenuScorer(get_food_index())
+
+def is_menu_choice_turn(messages):
+    """마지막 사용자 메시지가 식사 분석 바로 다음 턴(2단계 메뉴 후보 제시)인지 확인"""
+    replies = [m for m in messages[:-1] if not m.is_user]
+    return len(replies) == 1 and messages[-2] is replies[0]
+
+def pick_menu_locally(messages):
+    """2단계 턴이면 후보 메뉴를 로컬 점수로 정렬해 메시지에 기록 (1순위는 응답이 도착하면 추천 메뉴로 사용)
+
+    음식점을 미리 검색할 메뉴 목록 반환: 로컬 순위가 있으면 추천할 1순위만,
+    성분표와 정확히 일치하지 않는 후보가 있어 모델이 고르면 후보 전체, 2단계가 아니면 빈 목록
+    """
+    if not is_menu_choice_turn(messages):
+        return []
+    chat = messages[-1]
+    menus = extract_menus(chat.content)
+    ranking = get_menu_scorer().rank(
+        menus,
+        st.session_state['health_condition'],
+        st.session_state['nutrient_gaps']
+    )
+    if not ranking:
+        return menus
+    chat.menu_ranking = tuple(r.food for r in ranking)
+    # 모델 응답을 기다리지 않고 추천할 1순위의 음식점 검색을 바로 시작
+    return [ranking[0].food]
+
+@st.cache_resource
+def get_response_cache():
+    """식사 분석 응답 캐시 (프로세스 내 모든 세션이 공유)"""
+    cache = ResponseCache(maxsize=MEAL_ANALYSIS_CACHE_MAXSIZE, ttl=MEAL_ANALYSIS_CACHE_TTL)
+    metrics.register_cache("meal_analysis", cache.stats)
+    return cache
+
+def meal_analysis_cache_key(messages):
+    """첫 식사 분석 턴이면 응답 캐시 키 반환 (캐시 대상이 아니면 None)"""
+    if not MEAL_ANALYSIS_CACHE_ENABLED or len(messages) != 1:
+        return None
+    return ResponseCache.key(st.session_state['health_condition'], messages[0].content)
+
+@metrics.timed("gemini.turn")
+def get_gemini_response(messages, placeholder):
+    """Gemini 모델을 사용하여 응답을 생성하는 함수 (사용자 턴당 요청 1회)
+
+    응답은 도착할 때 한 번만 검증/파싱하여 채팅 기록용 메시지 레코드로 반환하며,
+    요청이 많아 시작하지 못하면 ModelThrottled 예외 발생
+    """
+    cache_key = meal_analysis_cache_key(messages)
+    if cache_key is not None:
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            record = ChatMessage.from_dict(cached)
+            placeholder.markdown(record.content, unsafe_allow_html=True)
+            return record
+    
+    try:
+        started = time.perf_counter()
+        prompt = build_user_prompt(messages)
+        window = get_context_window(messages, prompt)
+        # 이번 턴에 보내는 프롬프트 크기 기록
+        messages[-1].prompt_tokens = window.prompt_tokens
+        metrics.record("gemini.prompt_tokens", window.prompt_tokens)
+        pending = start_gemini_response(messages, window, prompt)
+        st.session_state['pending_response'] = pending
+        text = display_pending_response(pending, placeholder)
+        st.session_state['pending_response'] = None
+        advice = parse_response(text)
+        record = advice.to_record()
+        placeholder.markdown(record.content, unsafe_allow_html=True)
+        # 스키마에 맞지 않아 텍스트에서 추출한 응답은 다른 세션에 재사용하지 않음
+        if cache_key is not None and not advice.fallback:
+            get_response_cache().set(cache_key, record.to_dict(), time.perf_counter() - started)
+        return record
+    except ModelThrottled:
+        st.session_state['pending_response'] = None
+        raise
     except Exception as e:
-        st.error("❌ 답변 중 오류가 발생했습니다.")
+        # 실패한 턴이 남지 않도록 다음 턴에서 대화 세션을 다시 구성
+        metrics.error("gemini.turn")
+        st.session_state['pending_response'] = None
+        get_session_cache().pop('gemini_chat', None)
+        placeholder.empty()
+        st.error("❌ 답변 생성 중 오류가 발생했습니다.")
         st.error(f"상세 오류: {str(e)}")
-        return None
+        return ChatMessage(
+            content="죄송합니다. 답변을 생성하는 중에 문제가 발생했습니다. 다시 시도해 주세요.",
+            is_user=False
+        )
+
+def respond_to_last_message(chat_container, show_user_message=True):
+    """마지막 사용자 메시지에 대한 응답을 채팅 영역에 표시하고 기록에 추가"""
+    chat_history = st.session_state['chat_history']
+    with chat_container:
+        if show_user_message:
+            display_chat_message(chat_history[-1], len(chat_history) - 1)
+        if CHAT_RENDER_MODE == "legacy":
+            placeholder = st.empty()
+        else:
+            with st.chat_message("assistant", avatar=PAGE_ICON):
+                placeholder = st.empty()
+        try:
+            ai_response = get_gemini_response(chat_history, placeholder)
+        except ModelThrottled:
+            # 제한에 걸린 메시지는 기록에서 빼고 다시 보낼 수 있도록 안내
+            chat_history.pop()
+            st.session_state['notice'] = THROTTLED_MESSAGE
+            ai_response = None
+    
+    if ai_response:
+        chat_history.append(ai_response)
+        if ai_response.nutrient_gaps and not st.session_state['nutrient_gaps']:
+            st.session_state['nutrient_gaps'] = list(ai_response.nutrient_gaps)
+        # 추천 메뉴는 응답이 도착할 때 한 번만 반영 (로컬 순위가 있으면 그 1순위)
+        # 제한에 걸려 기록에서 빠진 메시지의 로컬 순위는 반영되지 않음
+        ranking = chat_history[-2].menu_ranking
+        menu = ranking[0] if ranking else ai_response.recommended_menu
+        if menu:
+            st.session_state['last_recommended_menu'] = menu
+        limit_session_memory()
+
+def display_chat_message(chat, index):
+    """채팅 메시지 하나 표시"""
+    if CHAT_RENDER_MODE == "legacy":
+        from streamlit_chat import message
 
-def display_chat_history():
-    """채팅 히스토리 표시"""
-    for i, chat in enumerate(st.session_state['chat_history']):
         message(
-            chat["content"],
-            is_user=chat["is_user"],
-            key=f"chat_{i}",
+            chat.content,
+            is_user=chat.is_user,
+            key=f"chat_{index}",
             allow_html=True  # HTML 태그 허용
         )
+    else:
+        role, avatar = ("user", None) if chat.is_user else ("assistant", PAGE_ICON)
+        with st.chat_message(role, avatar=avatar):
+            st.markdown(chat.content, unsafe_allow_html=True)
+
+def display_chat_history():
+    """채팅 히스토리 표시 (최근 메시지만 그리고 이전 메시지는 요청 시 펼침)"""
+    chat_history = st.session_state['chat_history']
+    hidden = max(0, len(chat_history) - CHAT_PAGE_SIZE * st.session_state['chat_pages'])
+    if hidden and st.button(f"이전 대화 더 보기 ({hidden}개)", key="chat_show_more"):
+        st.session_state['chat_pages'] += 1
+        st.rerun()
+    
+    for i in range(hidden, len(chat_history)):
+        display_chat_message(chat_history[i], i)
 
 def display_welcome_message():
     """시작 안내 메시지 표시"""
@@ -336,60 +678,195 @@ def custom_spinner(text="답변을 생성하고 있습니다..."):
         </div>
     """, unsafe_allow_html=True)
 
-def find_nearby_restaurants(menu, lat, lon, api_key):
-    """주변 음식점 검색"""
-    base_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        'location': f'{lat},{lon}',
-        'radius': '2000',  # 2km 반경
-        'type': 'restaurant',
-        'keyword': menu,
-        'language': 'ko',
-        'key': api_key
-    }
+@st.cache_resource
+def get_location_service():
+    """역지오코딩 서비스 (프로세스 내 모든 세션이 공유)"""
+    from http_client import get_http_client
+    from location_service import LocationService
+
+    service = LocationService(db_path=GEOCODE_DB_PATH, client=get_http_client())
+    metrics.register_cache("geocode", service.stats)
+    return service
+
+def wait_for_address():
+    """백그라운드 주소 조회가 끝날 때까지 주기적으로 확인"""
+    future = st.session_state.get('address_future')
+    if future is None or future.done():
+        st.rerun()
+    st.caption("📍 현재 위치를 확인하고 있습니다...")
+
+def display_current_address():
+    """현재 위치 주소 표시 (주소 조회가 끝나기 전에는 페이지를 먼저 그림)"""
+    future = st.session_state.get('address_future')
+    if future is not None:
+        if not future.done():
+            st.fragment(wait_for_address, run_every=ADDRESS_POLL_INTERVAL)()
+            return
+        del st.session_state['address_future']
+        try:
+            st.session_state['user_location']['address'] = future.result()
+        except Exception:
+            st.warning("위치 정보를 가져오는 중 오류가 발생했습니다. 브라우저의 위치 정보 접근을 허용해주세요.")
     
+    if 'user_location' in st.session_state and st.session_state['user_location'].get('address'):
+        st.success(f"📍 현재 위치: {st.session_state['user_location']['address']}")
+
+@st.cache_resource
+def get_places_cache():
+    """주변 음식점 검색 결과 캐시 (모든 세션이 공유, sqlite 백엔드면 여러 프로세스도 공유)"""
+    cache = make_cache("places", maxsize=PLACES_CACHE_MAXSIZE, ttl=PLACES_CACHE_TTL)
+    metrics.register_cache("places", cache.stats)
+    return cache
+
+@st.cache_resource
+def get_prefetcher():
+    """후보 메뉴 음식점 검색 작업 풀 (프로세스 내 모든 세션이 공유)"""
+    prefetcher = Prefetcher(max_workers=PREFETCH_WORKERS, max_pending=PREFETCH_MAX_PENDING)
+    metrics.register_counters("prefetch", prefetcher.stats)
+    return prefetcher
+
+@st.cache_resource
+def get_restaurant_search():
+    """주변 음식점 검색 엔진 (프로세스 내 모든 세션이 검색 결과 캐시를 공유)"""
+    from http_client import get_http_client
+    from restaurant_search import RestaurantSearch
+
+    return RestaurantSearch(
+        get_http_client(),
+        get_places_cache(),
+        grid=PLACES_CACHE_GRID,
+        language=PLACES_LANGUAGE,
+        url=PLACES_NEARBY_URL
+    )
+
+@metrics.timed("places.search")
+def find_nearby_restaurants(menus, lat, lon, api_key):
+    """주변 음식점 검색 (여러 메뉴의 결과를 합쳐 순위가 높은 음식점 반환)"""
+    engine = get_restaurant_search()
     try:
-        response = requests.get(base_url, params=params)
-        results = response.json().get('results', [])
-        return results[:5]  # 상위 5개 결과만 반환
+        # 미리 시작한 검색어 조회가 진행 중이면 캐시의 키 단위 잠금으로 그 결과를 이어받음
+        return engine.search(menus, lat, lon, api_key, limit=PLACES_RESULT_LIMIT)
     except Exception as e:
+        metrics.error("places.search")
         st.error(f"음식점 검색 중 오류가 발생했습니다: {str(e)}")
         return []
 
+def prefetch_restaurants(menus):
+    """후보 메뉴들의 음식점 검색을 미리 시작 (모델 응답을 기다리는 동안 실행)
+
+    가장 좁은 반경만 미리 조회하고 반경 넓히기는 실제 검색에 맡김
+    """
+    from restaurant_search import SEARCH_RADII
+
+    location = st.session_state.get('user_location')
+    if not location or not location.get('lat'):
+        return
+    lat, lon = location['lat'], location['lon']
+    api_key = st.secrets['GOOGLE_MAPS_API_KEY']
+    engine = get_restaurant_search()
+    prefetcher = get_prefetcher()
+    radius = SEARCH_RADII[0]
+    for menu in menus[:PREFETCH_MAX_MENUS]:
+        prefetcher.submit(
+            engine.cache_key(menu, lat, lon, radius),
+            engine.fetch_keyword, menu, lat, lon, radius, api_key
+        )
+
+@metrics.timed("map.render")
 def display_map_with_restaurants(restaurants, lat, lon):
     """음식점 위치를 지도에 표시"""
-    m = folium.Map(location=[lat, lon], zoom_start=15)
-    
-    # 현재 위치 마커
-    folium.Marker(
-        [lat, lon],
-        popup="현재 위치",
-        icon=folium.Icon(color='red', icon='info-sign')
-    ).add_to(m)
-    
-    # 음식점 마커
-    for restaurant in restaurants:
-        location = restaurant['geometry']['location']
-        name = restaurant['name']
-        rating = restaurant.get('rating', '평점 없음')
-        address = restaurant.get('vicinity', '주소 정보 없음')
-        
-        popup_html = f"""
-        <div style='width: 200px'>
-            <b>{name}</b><br>
-            평점: {rating}⭐<br>
-            주소: {address}
-        </div>
-        """
-        
-        folium.Marker(
-            [location['lat'], location['lng']],
-            popup=folium.Popup(popup_html, max_width=300),
-            icon=folium.Icon(color='green')
-        ).add_to(m)
-    
-    return m
+    if MAP_RENDERER == "pydeck":
+        st.pydeck_chart(build_pydeck_map(restaurants, lat, lon), height=MAP_HEIGHT)
+    elif MAP_RENDERER == "st_folium":
+        from streamlit_folium import st_folium
+
+        st_folium(
+            build_folium_map(restaurants, lat, lon),
+            key="restaurant_map",
+            height=MAP_HEIGHT,
+            returned_objects=[]  # 지도 조작으로 재실행되지 않도록 반환값 없음
+        )
+    else:
+        components.html(render_map_html(restaurants, lat, lon), height=MAP_HEIGHT + 10)
+
+def is_metrics_admin():
+    """?admin= 값이 설정된 관리자 토큰과 일치하는지 확인 (secrets 파일이 없으면 관리자 아님)"""
+    supplied = st.query_params.get("admin")
+    if not supplied:
+        return False
+    try:
+        token = st.secrets.get(METRICS_ADMIN_TOKEN_KEY)
+    except Exception:
+        return False
+    # compare_digest는 ASCII가 아닌 str을 비교하지 못하므로 바이트로 비교
+    return bool(token) and hmac.compare_digest(str(token).encode(), supplied.encode())
+
+def display_metrics_panel():
+    """관리자에게만 단계별 지연 시간, 오류 수, 캐시 적중률을 사이드바에 표시"""
+    if not metrics.enabled or not is_metrics_admin():
+        return
+    snapshot = metrics.snapshot()
+    with st.sidebar:
+        st.subheader("📊 단계별 지연 시간")
+        st.dataframe([
+            {
+                "단계": name,
+                "호출": stage['count'],
+                "오류": snapshot['errors'].get(name, 0),
+                "p50 (ms)": round(stage['p50'] * 1000, 1),
+                "p95 (ms)": round(stage['p95'] * 1000, 1),
+                "최대 (ms)": round(stage['max'] * 1000, 1)
+            }
+            for name, stage in sorted(snapshot['stages'].items())
+        ], hide_index=True)
+        if snapshot['values']:
+            st.subheader("📏 측정값")
+            st.dataframe([
+                {"항목": name, "횟수": value['count'], "p50": value['p50'], "p95": value['p95'], "최대": value['max']}
+                for name, value in sorted(snapshot['values'].items())
+            ], hide_index=True)
+        st.subheader("🗃️ 캐시")
+        st.dataframe([
+            {"캐시": name, "크기": stats['size'], "적중률": f"{stats['hit_ratio']:.0%}"}
+            for name, stats in sorted(snapshot['caches'].items())
+        ], hide_index=True)
+        if snapshot['counters']:
+            st.subheader("🚦 작업 제한")
+            st.dataframe([
+                {"작업": name, **counters} for name, counters in sorted(snapshot['counters'].items())
+            ], hide_index=True)
+        registry = get_session_registry()
+        sessions = registry.stats()
+        st.subheader("🧠 세션 메모리")
+        st.caption(f"활성 세션 {sessions['sessions']}개, 정리한 유휴 세션 {sessions['evicted']}개")
+        st.dataframe([
+            {
+                "세션": str(row['session_id'])[:8],
+                "유휴 (초)": round(row['idle_seconds']),
+                "상태 (KB)": round(row['state_bytes'] / 1024, 1),
+                "파생 캐시 (KB)": round(row['derived_bytes'] / 1024, 1)
+            }
+            for row in registry.report()
+        ], hide_index=True)
+        with st.expander("현재 세션 상태 항목별 크기 (바이트)"):
+            st.json({key: deep_size(value) for key, value in st.session_state.to_dict().items()})
+        if snapshot['errors']:
+            st.subheader("⚠️ 외부 호출 오류")
+            st.json(snapshot['errors'])
+        st.download_button(
+            "JSON 내려받기",
+            json.dumps(snapshot, ensure_ascii=False, indent=2),
+            file_name="metrics.json",
+            mime="application/json"
+        )
+
+def get_geolocation():
+    """브라우저에 현재 위치 요청 (streamlit_js_eval은 위치가 아직 없을 때만 불러옴)"""
+    from streamlit_js_eval import get_geolocation as request_geolocation
 
+    return request_geolocation()
+
+@metrics.timed("app.rerun")
 def main():
     # 페이지 설정
     st.set_page_config(
@@ -406,6 +883,11 @@ def main():
     
     # 세션 상태 초기화
     initialize_session_state()
+    # 유휴 세션 판단을 위해 이번 재실행 시각 기록
+    get_session_cache()
+    
+    # 관리자용 계측 패널
+    display_metrics_panel()
     
     # API 초기화
     if not initialize_gemini() or not initialize_google_maps():
@@ -418,13 +900,13 @@ def main():
             try:
                 lat = loc['coords']['latitude']
                 lon = loc['coords']['longitude']
-                geolocator = Nominatim(user_agent="my_health_fit_eat")
-                location = geolocator.reverse((lat, lon))
                 st.session_state['user_location'] = {
                     'lat': lat,
                     'lon': lon,
-                    'address': location.address if location else None
+                    'address': None
                 }
+                # 주소는 백그라운드에서 조회하고 완료되면 표시
+                st.session_state['address_future'] = get_location_service().reverse_async(lat, lon)
             except Exception as e:
                 st.warning("위치 정보를 가져오는 중 오류가 발생했습니다. 브라우저의 위치 정보 접근을 허용해주세요.")
         else:
@@ -434,13 +916,16 @@ def main():
     st.title(f"{PAGE_ICON} {PAGE_TITLE}")
     
     # 현재 위치 표시 (위치 정보가 있는 경우)
-    if 'user_location' in st.session_state and st.session_state['user_location'].get('address'):
-        st.success(f"📍 현재 위치: {st.session_state['user_location']['address']}")
+    display_current_address()
     
     # 새로운 대화 시작 버튼
     if st.button("새로운 대화 시작"):
         st.session_state['chat_history'] = []
         st.session_state['health_condition'] = None
+        get_session_cache().clear()
+        st.session_state['pending_response'] = None
+        st.session_state['chat_pages'] = 1
+        st.session_state['nutrient_gaps'] = []
         st.rerun()
     
     # 건강 상태 선택
@@ -460,17 +945,15 @@ def main():
     if not st.session_state['chat_history']:
         display_welcome_message()
     
+    # 이전 실행에서 남긴 안내 메시지 표시
+    if st.session_state['notice']:
+        st.warning(st.session_state['notice'])
+        st.session_state['notice'] = None
+    
     # 채팅 인터페이스
     chat_container = st.container()
     with chat_container:
         display_chat_history()
-        
-        # AI 응답에서 추천 메뉴 추출
-        if st.session_state['chat_history'] and not st.session_state['chat_history'][-1]['is_user']:
-            last_message = st.session_state['chat_history'][-1]['content']
-            if "추천메뉴:" in last_message:
-                recommended_menu = last_message.split("추천메뉴:")[-1].strip()
-                st.session_state['last_recommended_menu'] = recommended_menu
     
     # 주변 음식점 검색 (추천 메뉴가 있는 경우)
     if st.session_state.get('last_recommended_menu'):
@@ -483,7 +966,7 @@ def main():
                 
                 # 주변 음식점 검색
                 restaurants = find_nearby_restaurants(
-                    st.session_state['last_recommended_menu'],
+                    [st.session_state['last_recommended_menu']],
                     lat,
                     lon,
                     st.secrets['GOOGLE_MAPS_API_KEY']
@@ -491,8 +974,7 @@ def main():
                 
                 if restaurants:
                     # 지도 표시
-                    m = display_map_with_restaurants(restaurants, lat, lon)
-                    folium_static(m)
+                    display_map_with_restaurants(restaurants, lat, lon)
                     
                     # 음식점 목록 표시
                     st.subheader("📍 검색된 음식점 목록")
@@ -500,6 +982,7 @@ def main():
                         with st.expander(f"🏪 {restaurant['name']}"):
                             st.write(f"⭐ 평점: {restaurant.get('rating', '평점 없음')}")
                             st.write(f"📍 주소: {restaurant.get('vicinity', '주소 정보 없음')}")
+                            st.write(f"🚶 거리: 약 {restaurant['distance_m']:,.0f}m")
                 else:
                     st.info(f"주변에서 {st.session_state['last_recommended_menu']}를 판매하는 음식점을 찾지 못했습니다.")
             except Exception as e:
@@ -510,31 +993,32 @@ def main():
     # 사용자 입력 처리
     if st.session_state['health_condition']:
         user_input = st.chat_input("메시지를 입력하세요")
+        pending = st.session_state['pending_response']
         if user_input:
             try:
-                # 사용자 메시지 추가
-                st.session_state['chat_history'].append({
-                    "content": user_input,
-                    "is_user": True
-                })
+                # 진행 중인 응답과 같은 메시지가 다시 들어오면 새 요청 없이 그 응답을 이어받음
+                duplicate = pending is not None and pending.content == user_input
+                if not duplicate:
+                    st.session_state['chat_history'].append(ChatMessage(content=user_input, is_user=True))
+                    # 메뉴 추천 단계면 후보 메뉴를 로컬에서 채점하고 주변 음식점을 미리 검색
+                    prefetch_restaurants(pick_menu_locally(st.session_state['chat_history']))
                 
                 # AI 응답 생성
-                with custom_spinner():
-                    ai_response = get_gemini_response(st.session_state['chat_history'])
-                
-                if ai_response:
-                    st.session_state['chat_history'].append({
-                        "content": ai_response,
-                        "is_user": False
-                    })
-                
+                respond_to_last_message(chat_container, show_user_message=not duplicate)
                 st.rerun()
                 
             except Exception as e:
                 st.error("❌ 예상치 못한 오류가 발생했습니다.")
                 st.error(f"상세 오류: {str(e)}")
+        elif pending is not None and st.session_state['chat_history'] and st.session_state['chat_history'][-1].is_user:
+            # 이전 실행이 중단되어 끝나지 않은 응답을 이어서 표시
+            respond_to_last_message(chat_container, show_user_message=False)
+            st.rerun()
     else:
         st.warning("대화를 시작하기 전에 먼저 건강 상태를 선택해주세요.")
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        metrics.maybe_export()
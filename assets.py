@@ -0,0 +1,71 @@
+"""정적 자산 준비 (배경 이미지 재압축, CSS 축약을 프로세스당 한 번만 수행)"""
+import base64
+import io
+import os
+import re
+from functools import lru_cache
+
+from PIL import Image
+
+BACKGROUND_MAX_WIDTH = 1024  # 배경 이미지 최대 가로 크기 (px)
+BACKGROUND_QUALITY = 80  # WebP 압축 품질
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL_PREFIX = "app/static"
+
+
+def optimize_image(path, max_width=BACKGROUND_MAX_WIDTH, quality=BACKGROUND_QUALITY):
+    """이미지를 축소하고 WebP로 재압축 (실패하면 원본 PNG 그대로 반환)"""
+    try:
+        with Image.open(path) as image:
+            image.thumbnail((max_width, max_width * 4))
+            buffer = io.BytesIO()
+            image.save(buffer, format="WEBP", quality=quality, method=6)
+            return buffer.getvalue(), "image/webp"
+    except Exception:
+        with open(path, 'rb') as f:
+            return f.read(), "image/png"
+
+
+@lru_cache(maxsize=8)
+def _data_uri(path, mtime_ns):
+    data, mime = optimize_image(path)
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+@lru_cache(maxsize=8)
+def _static_url(path, mtime_ns):
+    data, mime = optimize_image(path)
+    extension = ".webp" if mime == "image/webp" else ".png"
+    name = os.path.splitext(os.path.basename(path))[0] + extension
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    target = os.path.join(STATIC_DIR, name)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, target)
+    # 파일이 바뀌면 브라우저 캐시도 갱신되도록 버전 파라미터 추가
+    return f"{STATIC_URL_PREFIX}/{name}?v={mtime_ns}"
+
+
+def image_url(path, static_serving=False):
+    """배경용 이미지 URL 반환 (파일 수정 시각이 같으면 이전 결과 재사용)
+
+    static_serving이 켜져 있으면 최적화된 파일을 static 폴더에 저장하고 그 URL을,
+    아니면 data URI를 반환
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    if static_serving:
+        try:
+            return _static_url(path, mtime_ns)
+        except OSError:
+            pass
+    return _data_uri(path, mtime_ns)
+
+
+@lru_cache(maxsize=16)
+def style_tag(css):
+    """주석과 불필요한 공백을 제거한 <style> 태그 생성"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return f"<style>{css.strip()}</style>"
@@ -0,0 +1,214 @@
+"""API 키 없이 전체 앱(main)을 여러 턴 대화로 실행하는 부하 측정
+
+Gemini, Places, Nominatim은 benchmarks/fakes.py의 로컬 대체 백엔드로 연결하고
+AppTest로 대화를 진행하며 턴별 재실행 시간 (p50/p95), 턴당 외부 호출 수,
+대화 길이에 따른 메모리 증가, 프롬프트 토큰 수를 측정함
+
+사용법: python benchmarks/app_load.py [--conversations N] [--turns N] [--gemini-latency 초] ...
+--max-p95-ms를 지정하면 턴 재실행 p95가 이를 넘을 때 종료 코드 1 반환 (CI 회귀 확인용)
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fakes
+from metrics import metrics
+from session_memory import deep_size
+
+HEALTH_CONDITIONS = ("당뇨", "빈혈", "고혈압", "비만", "이상 없음")
+MEALS = (
+    "아침에 토스트, 점심에 김치찌개, 저녁에 치킨을 먹었어",
+    "아침은 굶고 점심에 라면, 저녁에 삼겹살을 먹었어",
+    "아침에 시리얼, 점심에 김밥, 저녁에 짜장면을 먹었어",
+)
+MENU_CHOICES = (
+    ("비빔밥", "연어덮밥", "순대국"),
+    ("된장찌개", "샐러드", "닭가슴살"),
+    ("고등어구이", "미역국", "현미밥"),
+    ("삼계탕", "쌀국수", "샤브샤브"),
+)
+FAKE_SECRETS = {'GEMINI_API_KEY': "fake-gemini-key", 'GOOGLE_MAPS_API_KEY': "fake-maps-key"}
+
+
+def run_app(root):
+    """AppTest에서 실행할 스크립트: 대체 백엔드를 연결하고 app.main() 실행"""
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.join(root, "benchmarks"))
+    sys.path.insert(0, root)
+    import app
+    import fakes
+
+    fakes.install(app)
+    app.main()
+
+
+def rss_mb():
+    """현재 프로세스의 RSS (MB, /proc가 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def turn_messages(conversation, turns):
+    """대화 하나의 사용자 메시지 목록 (첫 턴은 식사 분석, 이후는 메뉴 추천)"""
+    messages = [MEALS[conversation % len(MEALS)]]
+    for turn in range(1, turns):
+        menus = MENU_CHOICES[(conversation + turn) % len(MENU_CHOICES)]
+        messages.append(f"{', '.join(menus)} 중에 뭐가 좋을까?")
+    return messages
+
+
+def run_conversation(conversation, turns, timeout):
+    """대화 하나를 진행하며 턴별 측정값 반환"""
+    at = AppTest.from_function(run_app, args=(ROOT,), default_timeout=timeout)
+    at.secrets.update(FAKE_SECRETS)
+    at.run()
+    at.selectbox[0].select(HEALTH_CONDITIONS[conversation % len(HEALTH_CONDITIONS)]).run()
+
+    rows = []
+    for turn, text in enumerate(turn_messages(conversation, turns), start=1):
+        before = fakes.counters.snapshot()
+        started = time.perf_counter()
+        at.chat_input[0].set_value(text).run()
+        turn_ms = (time.perf_counter() - started) * 1000
+        # 입력 없이 다시 실행한 시간 (위젯 조작 등 일반 재실행 비용)
+        started = time.perf_counter()
+        at.run()
+        idle_ms = (time.perf_counter() - started) * 1000
+        after = fakes.counters.snapshot()
+        history = at.session_state['chat_history']
+        rows.append({
+            'turn': turn,
+            'turn_ms': turn_ms,
+            'idle_ms': idle_ms,
+            'calls': {k: after.get(k, 0) - before.get(k, 0) for k in after if after.get(k, 0) != before.get(k, 0)},
+            'history_bytes': deep_size(history),
+            'rss_mb': rss_mb(),
+            'errors': len(at.exception) + len(at.error),
+        })
+    return rows
+
+
+def summarize(rows, turns):
+    """전체 대화의 측정값을 턴 순서별로 집계"""
+    by_turn = []
+    for turn in range(1, turns + 1):
+        selected = [r for r in rows if r['turn'] == turn]
+        calls = {}
+        for r in selected:
+            for name, count in r['calls'].items():
+                calls[name] = calls.get(name, 0) + count
+        by_turn.append({
+            'turn': turn,
+            'turn_p50_ms': percentile([r['turn_ms'] for r in selected], 0.5),
+            'turn_p95_ms': percentile([r['turn_ms'] for r in selected], 0.95),
+            'idle_p50_ms': percentile([r['idle_ms'] for r in selected], 0.5),
+            'calls_per_turn': {k: v / len(selected) for k, v in sorted(calls.items())},
+            'history_bytes': statistics.mean(r['history_bytes'] for r in selected),
+            'rss_mb': statistics.mean(r['rss_mb'] for r in selected),
+            'errors': sum(r['errors'] for r in selected),
+        })
+    return {
+        'turn_p50_ms': percentile([r['turn_ms'] for r in rows], 0.5),
+        'turn_p95_ms': percentile([r['turn_ms'] for r in rows], 0.95),
+        'idle_p50_ms': percentile([r['idle_ms'] for r in rows], 0.5),
+        'idle_p95_ms': percentile([r['idle_ms'] for r in rows], 0.95),
+        'by_turn': by_turn,
+    }
+
+
+def print_report(report):
+    print(f"턴 재실행 p50 {report['turn_p50_ms']:.1f} ms, p95 {report['turn_p95_ms']:.1f} ms")
+    print(f"입력 없는 재실행 p50 {report['idle_p50_ms']:.1f} ms, p95 {report['idle_p95_ms']:.1f} ms")
+    tokens = report.get('values', {}).get('gemini.prompt_tokens')
+    if tokens:
+        print(f"프롬프트 토큰 (추정) p50 {tokens['p50']:.0f}, p95 {tokens['p95']:.0f}, 최대 {tokens['max']:.0f}")
+    for name, counters in sorted(report.get('counters', {}).items()):
+        print(f"{name} 작업: " + ", ".join(f"{k}={v}" for k, v in counters.items()))
+    print(f"{'턴':>3} {'p50(ms)':>9} {'p95(ms)':>9} {'재실행(ms)':>10} {'기록(KB)':>9} {'RSS(MB)':>9} {'오류':>4}  턴당 외부 호출")
+    for row in report['by_turn']:
+        calls = ", ".join(f"{k}={v:.1f}" for k, v in row['calls_per_turn'].items())
+        print(
+            f"{row['turn']:>3} {row['turn_p50_ms']:>9.1f} {row['turn_p95_ms']:>9.1f} {row['idle_p50_ms']:>10.1f} "
+            f"{row['history_bytes'] / 1024:>9.1f} {row['rss_mb']:>9.1f} {row['errors']:>4}  {calls}"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=5, help="진행할 대화 수")
+    parser.add_argument("--turns", type=int, default=6, help="대화당 사용자 턴 수")
+    parser.add_argument("--gemini-latency", type=float, default=0.3, help="Gemini 첫 응답 지연 (초)")
+    parser.add_argument("--gemini-chunk-latency", type=float, default=0.02, help="스트리밍 청크 간 지연 (초)")
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--places-latency", type=float, default=0.15, help="Places 응답 지연 (초)")
+    parser.add_argument("--places-failure-rate", type=float, default=0.0)
+    parser.add_argument("--places-pages", type=int, default=1, help="검색어당 결과 페이지 수")
+    parser.add_argument("--geocode-latency", type=float, default=0.2, help="Nominatim 응답 지연 (초)")
+    parser.add_argument("--geocode-failure-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=60, help="AppTest 실행 한 번의 제한 시간 (초)")
+    parser.add_argument("--json", help="측정 결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--max-p95-ms", type=float, help="턴 재실행 p95 허용 상한 (넘으면 종료 코드 1)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.chdir(ROOT)
+    server = fakes.FakeUpstreamServer(
+        places_fault=fakes.Fault(args.places_latency, args.places_failure_rate, seed=1),
+        geocode_fault=fakes.Fault(args.geocode_latency, args.geocode_failure_rate, seed=2),
+        pages=args.places_pages
+    ).start()
+    model = fakes.FakeGenerativeModel(
+        fault=fakes.Fault(args.gemini_latency, args.gemini_failure_rate, seed=3),
+        chunk_latency=args.gemini_chunk_latency,
+        menus=tuple(menu for menus in MENU_CHOICES for menu in menus)
+    )
+    fakes.activate(model, server)
+    st.cache_resource.clear()
+
+    rows = []
+    try:
+        for conversation in range(args.conversations):
+            rows.extend(run_conversation(conversation, args.turns, args.timeout))
+    finally:
+        server.stop()
+
+    report = summarize(rows, args.turns)
+    # 앱 내부 계측 (단계별 지연 시간과 캐시 적중률)
+    snapshot = metrics.snapshot()
+    report['stages'] = snapshot['stages']
+    report['values'] = snapshot['values']
+    report['caches'] = snapshot['caches']
+    report['counters'] = snapshot['counters']
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.max_p95_ms is not None and report['turn_p95_ms'] > args.max_p95_ms:
+        print(f"턴 재실행 p95가 허용 상한 {args.max_p95_ms:.0f} ms를 넘었습니다.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""채팅 기록 길이에 따른 재실행 시간 측정 (native / legacy 표시 방식 비교)
+
+서버 측 스크립트 실행 시간과 화면에 그려지는 채팅 요소 수를 측정함
+(legacy 방식은 메시지마다 iframe이 추가되어 브라우저 렌더링 비용이 별도로 듦).
+baseline은 이전 동작처럼 legacy 방식으로 기록 전체를 매번 그리는 경우
+
+사용법: python benchmarks/chat_render.py [반복 횟수]
+"""
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_LENGTHS = (10, 50, 100, 200)
+# (이름, 표시 방식, 페이지 나누기 여부)
+CASES = (("baseline", "legacy", False), ("legacy", "legacy", True), ("native", "native", True))
+
+
+def render_history(root, mode, count, page_size):
+    """AppTest에서 실행할 스크립트: 채팅 기록만 표시"""
+    import sys
+
+    import streamlit as st
+
+    sys.path.insert(0, root)
+    import app
+    from session_memory import ChatMessage
+
+    app.CHAT_RENDER_MODE = mode
+    app.CHAT_PAGE_SIZE = page_size
+    if 'chat_history' not in st.session_state:
+        st.session_state['chat_history'] = [
+            ChatMessage(content=f"메시지 {i} " + "토스트, 김치찌개, 치킨을 먹었어. " * 5, is_user=i % 2 == 0)
+            for i in range(count)
+        ]
+        st.session_state['chat_pages'] = 1
+    app.display_chat_history()
+
+
+def measure(mode, count, page_size, repeat):
+    """재실행 시간 중앙값(ms)과 채팅 요소 수 반환"""
+    at = AppTest.from_function(render_history, args=(ROOT, mode, count, page_size))
+    at.run()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - started) * 1000)
+    elements = len(at.chat_message) if mode == "native" else len(at.get("component_instance"))
+    return statistics.median(timings), elements
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    sys.path.insert(0, ROOT)
+    from app import CHAT_PAGE_SIZE
+
+    print(f"{'방식':<8} {'기록 길이':>10} {'재실행(ms)':>12} {'채팅 요소 수':>14}")
+    for name, mode, paginate in CASES:
+        for count in HISTORY_LENGTHS:
+            elapsed, elements = measure(mode, count, CHAT_PAGE_SIZE if paginate else count, repeat)
+            print(f"{name:<8} {count:>10} {elapsed:>12.1f} {elements:>14}")
+
+
+if __name__ == "__main__":
+    main()
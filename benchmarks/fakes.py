@@ -0,0 +1,247 @@
+"""벤치마크용 로컬 대체 백엔드 (Gemini 대화 API, Places Nearby Search, Nominatim)
+
+모든 대체 백엔드는 지연 시간과 실패 확률을 설정할 수 있고 호출 수를 기록함.
+Places와 Nominatim은 로컬 HTTP 서버로 제공하여 실제 HTTP 클라이언트와 geopy 경로를 그대로 거침
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+LAT, LON = 37.5665, 126.9780
+PLACES_PATH = "/maps/api/place/nearbysearch/json"
+REVERSE_PATH = "/reverse"
+STREAM_CHUNK_SIZE = 24  # 스트리밍 청크 하나의 글자 수
+DEFAULT_MENU = "비빔밥"
+
+
+class Counters:
+    """스레드 안전 호출 카운터"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def incr(self, name):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+counters = Counters()
+
+
+class Fault:
+    """지연 시간과 실패 확률 설정 (시드를 고정해 실행마다 같은 순서로 실패)"""
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.failure_rate
+
+
+class FakeChatSession:
+    """google.generativeai ChatSession 대체 (send_message만 지원)"""
+
+    def __init__(self, model, history):
+        self._model = model
+        self.history = list(history)
+
+    def send_message(self, content, stream=False):
+        counters.incr("gemini.send_message")
+        self._model.fault.delay()
+        if self._model.fault.should_fail():
+            counters.incr("gemini.failure")
+            raise RuntimeError("fake Gemini failure")
+        text = self._model.respond(content, self.history)
+        self.history.extend([
+            {"role": "user", "parts": [content]},
+            {"role": "model", "parts": [text]}
+        ])
+        if not stream:
+            return SimpleNamespace(text=text)
+        return self._stream(text)
+
+    def _stream(self, text):
+        for start in range(0, len(text), STREAM_CHUNK_SIZE):
+            if self._model.chunk_latency:
+                time.sleep(self._model.chunk_latency)
+            yield SimpleNamespace(text=text[start:start + STREAM_CHUNK_SIZE])
+
+
+class FakeGenerativeModel:
+    """google.generativeai GenerativeModel 대체 (응답 스키마에 맞는 JSON 생성)
+
+    첫 턴은 식사 분석, 이후 턴은 사용자 메시지의 첫 번째 메뉴를 추천함
+    """
+
+    def __init__(self, fault=None, chunk_latency=0.0, menus=()):
+        self.fault = fault or Fault()
+        self.chunk_latency = chunk_latency
+        self.menus = menus
+
+    def start_chat(self, history=None):
+        counters.incr("gemini.start_chat")
+        return FakeChatSession(self, history or [])
+
+    def respond(self, content, history):
+        if not history:
+            return json.dumps({
+                "reply": "식사를 분석해 봤어요. 단백질과 식이섬유가 조금 부족해 보여요. " * 3,
+                "nutrient_gaps": ["단백질", "식이섬유"],
+                "recommended_menu": None,
+                "advice": "채소를 곁들여 드세요."
+            }, ensure_ascii=False)
+        menu = next((m for m in self.menus if m in content), DEFAULT_MENU)
+        return json.dumps({
+            "reply": f"지금 상태에는 {menu}을(를) 추천해요. 단백질과 채소를 함께 채울 수 있어요. " * 2,
+            "nutrient_gaps": ["단백질"],
+            "recommended_menu": menu,
+            "advice": "천천히 드세요."
+        }, ensure_ascii=False)
+
+
+def sample_places(lat, lon, keyword, count, page):
+    """검색어와 위치로 결정되는 가짜 음식점 목록 생성"""
+    rng = random.Random(f"{keyword}:{page}")
+    return [{
+        'place_id': f"{keyword}_{page}_{i}",
+        'name': f"{keyword} 맛집 {page * count + i}",
+        'rating': round(rng.uniform(3, 5), 1),
+        'user_ratings_total': rng.randint(0, 500),
+        'vicinity': f"서울 중구 테스트로 {i}",
+        'geometry': {'location': {
+            'lat': lat + rng.uniform(-0.01, 0.01),
+            'lng': lon + rng.uniform(-0.01, 0.01)
+        }}
+    } for i in range(count)]
+
+
+class FakeUpstreamServer:
+    """Places Nearby Search와 Nominatim reverse를 흉내 내는 로컬 HTTP 서버
+
+    실패는 HTTP 503으로 응답하여 공용 HTTP 클라이언트의 재시도 경로를 거치게 함
+    """
+
+    def __init__(self, places_fault=None, geocode_fault=None, results_per_page=20, pages=1):
+        self.places_fault = places_fault or Fault()
+        self.geocode_fault = geocode_fault or Fault()
+        self.results_per_page = results_per_page
+        self.pages = pages
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstream", daemon=True)
+
+    @property
+    def netloc(self):
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def places_url(self):
+        return f"http://{self.netloc}{PLACES_PATH}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def places(self, query):
+        counters.incr("places.request")
+        self.places_fault.delay()
+        if self.places_fault.should_fail():
+            counters.incr("places.failure")
+            return 503, {"status": "UNKNOWN_ERROR"}
+        if 'pagetoken' in query:
+            keyword, page = query['pagetoken'].rsplit(":", 1)
+            page = int(page)
+            lat, lon = LAT, LON
+        else:
+            keyword, page = query.get('keyword', ''), 0
+            lat, lon = (float(v) for v in query['location'].split(","))
+        body = {'status': 'OK', 'results': sample_places(lat, lon, keyword, self.results_per_page, page)}
+        if page + 1 < self.pages:
+            body['next_page_token'] = f"{keyword}:{page + 1}"
+        return 200, body
+
+    def reverse(self, query):
+        counters.incr("geocode.reverse")
+        self.geocode_fault.delay()
+        if self.geocode_fault.should_fail():
+            counters.incr("geocode.failure")
+            return 503, {"error": "Service Unavailable"}
+        return 200, {
+            'place_id': 1,
+            'lat': query['lat'],
+            'lon': query['lon'],
+            'display_name': "서울특별시 중구 세종대로 110"
+        }
+
+    def _handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path == PLACES_PATH:
+                    status, body = upstream.places(query)
+                elif url.path == REVERSE_PATH:
+                    status, body = upstream.reverse(query)
+                else:
+                    status, body = 404, {}
+                payload = json.dumps(body, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+_active = None
+
+
+def activate(model, server):
+    """AppTest 스크립트에서 사용할 대체 백엔드 지정"""
+    global _active
+    _active = (model, server)
+
+
+def install(app):
+    """app 모듈이 지정된 대체 백엔드를 쓰도록 연결 (공유 자원이 만들어지기 전에 호출)"""
+    import location_service
+    import restaurant_search
+
+    if getattr(app, '_fakes_installed', False):
+        return
+    model, server = _active
+    app.get_gemini_model = lambda: model
+    app.get_geolocation = lambda *args, **kwargs: {'coords': {'latitude': LAT, 'longitude': LON}}
+    app.PLACES_NEARBY_URL = server.places_url
+    app.GEOCODE_DB_PATH = None
+    location_service.GEOCODER_DOMAIN = server.netloc
+    location_service.GEOCODER_SCHEME = "http"
+    restaurant_search.PAGE_TOKEN_DELAY = 0
+    app._fakes_installed = True
@@ -0,0 +1,91 @@
+"""app 모듈 import 시간 측정 (python -X importtime)
+
+streamlit을 먼저 불러온 뒤 app을 import하는 데 걸린 누적 시간과 가장 무거운 하위 모듈,
+무거운 의존성(grpc, folium, geopy 등)이 시작 시점에 불러와지는지 출력함.
+git 리비전을 넘기면 해당 리비전의 트리에서도 측정하여 나란히 비교
+
+사용법: python benchmarks/import_time.py [비교할 git 리비전] [반복 횟수]
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = (
+    "google.generativeai", "grpc", "folium", "streamlit_folium", "pydeck",
+    "geopy", "requests", "streamlit_js_eval", "streamlit_chat", "pandas", "numpy"
+)
+TOP_MODULES = 10
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def profile(tree):
+    """tree에서 app을 import하고 (app 누적 시간 ms, app이 새로 불러온 모듈별 (깊이, 누적 시간 us)) 반환
+
+    -X importtime은 하위 모듈을 먼저 출력하므로 streamlit 줄과 app 줄 사이가 app이 불러온 모듈임
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import streamlit; import app"],
+        cwd=tree, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        name, depth, cumulative = match.group(4), len(match.group(3)) // 2, int(match.group(2))
+        if depth == 0 and name == "streamlit":
+            modules = {}
+        elif depth == 0 and name == "app":
+            return cumulative / 1000, modules
+        else:
+            modules[name] = (depth, cumulative)
+    raise RuntimeError("import 시간 출력에서 app을 찾지 못했습니다.")
+
+
+def export_revision(revision, directory):
+    """git 리비전의 트리를 directory에 풀어 놓음"""
+    with tempfile.TemporaryFile() as archive:
+        subprocess.run(["git", "archive", revision], cwd=ROOT, stdout=archive, check=True)
+        archive.seek(0)
+        with tarfile.open(fileobj=archive) as tar:
+            tar.extractall(directory)
+
+
+def measure(label, tree, repeat):
+    """repeat회 측정한 app import 시간 중앙값과 무거운 모듈 출력"""
+    runs = [profile(tree) for _ in range(repeat)]
+    elapsed = statistics.median(total for total, _ in runs)
+    modules = runs[-1][1]
+    loaded = [name for name in HEAVY_MODULES if name in modules]
+    print(f"[{label}] import app: {elapsed:.1f} ms (중앙값, {repeat}회)")
+    print(f"  app이 시작 시 새로 불러오는 무거운 의존성: {', '.join(loaded) or '없음'}")
+    # app이 직접 import한 모듈 중 누적 시간이 큰 순서
+    heaviest = sorted(
+        ((name, us) for name, (depth, us) in modules.items() if depth == 1),
+        key=lambda item: item[1], reverse=True
+    )[:TOP_MODULES]
+    for name, us in heaviest:
+        print(f"  {name:<28} {us / 1000:>9.1f} ms")
+    return elapsed
+
+
+def main():
+    revision = sys.argv[1] if len(sys.argv) > 1 else None
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    current = measure("작업 트리", ROOT, repeat)
+    if revision:
+        with tempfile.TemporaryDirectory() as directory:
+            export_revision(revision, directory)
+            before = measure(revision, directory, repeat)
+        print(f"차이: {current - before:+.1f} ms ({revision} 대비)")
+
+
+if __name__ == "__main__":
+    main()
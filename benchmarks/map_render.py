@@ -0,0 +1,60 @@
+"""지도 렌더링 비용 측정 (HTML 크기와 생성 시간)
+
+사용법: python benchmarks/map_render.py [음식점 수] [반복 횟수]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import folium
+
+import maps
+
+LAT, LON = 37.5665, 126.9780
+
+
+def sample_restaurants(count):
+    """측정용 가짜 음식점 목록 생성"""
+    rng = random.Random(0)
+    return [{
+        'place_id': f"place_{i}",
+        'name': f"음식점 {i}",
+        'rating': round(rng.uniform(3, 5), 1),
+        'vicinity': f"서울 중구 테스트로 {i}",
+        'geometry': {'location': {
+            'lat': LAT + rng.uniform(-0.01, 0.01),
+            'lng': LON + rng.uniform(-0.01, 0.01)
+        }}
+    } for i in range(count)]
+
+
+def measure(label, render, repeat):
+    """렌더링 함수의 평균 시간과 결과 크기 출력"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        payload = render()
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    print(f"{label:<28} {elapsed:>10.2f} ms {len(payload.encode()):>12,} bytes")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    restaurants = sample_restaurants(count)
+    
+    print(f"음식점 {count}개, {repeat}회 평균")
+    print(f"{'방식':<28} {'시간':>13} {'크기':>18}")
+    # 기존 방식: 재실행마다 지도를 새로 만들고 HTML 직렬화
+    measure("folium (매번 생성)", lambda: folium.Figure().add_child(
+        maps.build_folium_map(restaurants, LAT, LON)).render(), repeat)
+    # 캐시 적용: 첫 호출 이후에는 저장된 HTML 재사용
+    maps.render_map_html(restaurants, LAT, LON)
+    measure("folium (HTML 캐시)", lambda: maps.render_map_html(restaurants, LAT, LON), repeat)
+    measure("pydeck (JSON)", lambda: maps.build_pydeck_map(restaurants, LAT, LON).to_json(), repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""캐시 백엔드 (프로세스 메모리 / 같은 호스트의 여러 프로세스가 공유하는 SQLite)
+
+모든 백엔드는 TTL 만료, 크기 제한 축출, 적중/실패 통계와
+같은 키를 동시에 계산하지 않도록 막는 get_or_compute를 제공함
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from cachetools import TTLCache
+
+# 외부 호출 결과 캐시에 쓸 백엔드 ("memory" 또는 "sqlite"), 여러 프로세스로 띄울 때는 sqlite 사용
+CACHE_BACKEND = os.environ.get("HEALTHFITEAT_CACHE_BACKEND", "memory")
+CACHE_PATH = os.environ.get("HEALTHFITEAT_CACHE_PATH", ".cache/shared_cache.sqlite3")
+LOCK_TTL = 30  # 계산 중 표시(lease)의 유효 시간 (초, 계산하는 동안 LOCK_TTL / 3마다 연장)
+LOCK_POLL_INTERVAL = 0.05  # 다른 프로세스의 계산 완료를 확인하는 주기 (초)
+EVICT_EVERY = 32  # 크기를 넘지 않아도 이 횟수만큼 저장할 때마다 만료 항목 정리
+ACCESS_RESOLUTION = 60  # 조회 시 마지막 사용 시각을 다시 기록하는 최소 간격 (초)
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """캐시 백엔드 공통 인터페이스"""
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, default=None):
+        """캐시 조회 (적중/실패 카운터 갱신)"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """캐시 저장 (ttl을 생략하면 백엔드 기본값)"""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """캐시 항목 삭제"""
+        raise NotImplementedError
+
+    def clear(self):
+        """캐시 비우기"""
+        raise NotImplementedError
+
+    def size(self):
+        """저장된 항목 수"""
+        raise NotImplementedError
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """캐시에 없으면 compute()로 계산해 저장 후 반환 (같은 키의 동시 계산은 한 번만 실행)
+
+        compute가 예외를 던지면 저장하지 않고 그대로 전달
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """캐시 통계 반환"""
+        with self._stats_lock:
+            total = self.hits + self.misses
+            hits, misses = self.hits, self.misses
+        return {
+            'size': self.size(),
+            'maxsize': self.maxsize,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+        }
+
+
+class MemoryCache(CacheBackend):
+    """프로세스 메모리 캐시 (TTL 만료, 가득 차면 가장 오래 사용되지 않은 항목부터 축출)"""
+
+    def __init__(self, maxsize, ttl):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # 항목별 TTL을 지원하기 위해 (만료 시각, 값)으로 저장하고 기본 TTL을 상한으로 사용
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _lookup(self, key):
+        entry = self._cache.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return _MISSING
+        return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+        self._count(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        ttl = min(ttl or self.ttl, self.ttl)
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def size(self):
+        with self._lock:
+            return self._cache.currsize
+
+    def get_or_compute(self, key, compute, ttl=None):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                # 먼저 계산을 시작한 스레드가 저장한 값이 있으면 재사용
+                with self._lock:
+                    value = self._lookup(key)
+                if value is _MISSING:
+                    value = compute()
+                    self.set(key, value, ttl)
+                return value
+        finally:
+            with self._lock:
+                if not key_lock.locked():
+                    self._key_locks.pop(key, None)
+
+
+class SQLiteCache(CacheBackend):
+    """같은 호스트의 여러 프로세스가 공유하는 SQLite 캐시
+
+    값은 JSON으로 저장하며, 크기를 넘으면 가장 오래 사용되지 않은 항목부터 축출함.
+    조회할 때마다 쓰기 잠금을 잡지 않도록 마지막 사용 시각은 ACCESS_RESOLUTION초 단위로만 갱신함.
+    get_or_compute는 계산 중 표시(lease) 행으로 프로세스 간 중복 계산을 막음
+    """
+
+    def __init__(self, path, namespace, maxsize, ttl):
+        super().__init__()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._owner = uuid.uuid4().hex
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_locks ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, owner TEXT NOT NULL, "
+                "expires REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (namespace, accessed)")
+
+    @staticmethod
+    def _encode_key(key):
+        return json.dumps(key, ensure_ascii=False, sort_keys=True)
+
+    def _lookup(self, encoded):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, accessed FROM cache WHERE namespace = ? AND key = ? AND expires > ?",
+                (self.namespace, encoded, now)
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            if now - row[1] >= ACCESS_RESOLUTION:
+                self._conn.execute(
+                    "UPDATE cache SET accessed = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, encoded)
+                )
+        return json.loads(row[0])
+
+    def get(self, key, default=None):
+        value = self._lookup(self._encode_key(key))
+        self._count(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, self._encode_key(key), json.dumps(value, ensure_ascii=False),
+                 now + (ttl or self.ttl), now)
+            )
+            self._writes += 1
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+            if count > self.maxsize or self._writes % EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires <= ?", (self.namespace, now)
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache WHERE namespace = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.maxsize)
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, self._encode_key(key))
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def size(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ? AND expires > ?", (self.namespace, time.time())
+            ).fetchone()[0]
+
+    def _acquire(self, encoded):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_locks WHERE namespace = ? AND key = ? AND expires <= ?",
+                (self.namespace, encoded, now)
+            )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO cache_locks (namespace, key, owner, expires) VALUES (?, ?, ?, ?)",
+                (self.namespace, encoded, self._owner, now + LOCK_TTL)
+            )
+            return cursor.rowcount == 1
+
+    def _renew(self, encoded, done):
+        # 계산이 LOCK_TTL보다 오래 걸려도 다른 프로세스가 같은 키를 계산하지 않도록 lease 연장
+        while not done.wait(LOCK_TTL / 3):
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE cache_locks SET expires = ? WHERE namespace = ? AND key = ? AND owner = ?",
+                    (time.time() + LOCK_TTL, self.namespace, encoded, self._owner)
+                )
+
+    def _release(self, encoded):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_locks WHERE namespace = ? AND key = ? AND owner = ?",
+                (self.namespace, encoded, self._owner)
+            )
+
+    def get_or_compute(self, key, compute, ttl=None):
+        encoded = self._encode_key(key)
+        value = self._lookup(encoded)
+        self._count(value is not _MISSING)
+        while value is _MISSING:
+            if self._acquire(encoded):
+                done = threading.Event()
+                threading.Thread(
+                    target=self._renew, args=(encoded, done), name="cache-lease", daemon=True
+                ).start()
+                try:
+                    value = self._lookup(encoded)
+                    if value is _MISSING:
+                        value = compute()
+                        self.set(key, value, ttl)
+                finally:
+                    done.set()
+                    self._release(encoded)
+                break
+            # 다른 스레드/프로세스가 계산 중이면 저장될 때까지 대기
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = self._lookup(encoded)
+        return value
+
+
+def make_cache(namespace, maxsize, ttl, backend=None):
+    """설정된 백엔드로 캐시 생성 (backend를 생략하면 CACHE_BACKEND)"""
+    backend = backend or CACHE_BACKEND
+    if backend == "sqlite":
+        return SQLiteCache(CACHE_PATH, namespace, maxsize=maxsize, ttl=ttl)
+    if backend == "memory":
+        return MemoryCache(maxsize=maxsize, ttl=ttl)
+    raise ValueError(f"알 수 없는 캐시 백엔드입니다: {backend}")
@@ -0,0 +1,113 @@
+"""대화 기록 창 관리 (최근 턴은 그대로 두고 이전 턴은 요약으로 접어 프롬프트 크기 제한)"""
+import math
+import re
+
+from menu_text import extract_menus
+
+CHARS_PER_TOKEN = 2  # 한국어 위주 텍스트의 대략적인 글자 수 대비 토큰 비율
+NUTRIENTS = (
+    "단백질", "탄수화물", "지방", "식이섬유", "비타민", "철분", "칼슘",
+    "칼륨", "마그네슘", "아연", "오메가3", "무기질", "엽산", "수분"
+)
+_GAP_HINT = re.compile(r"부족|더 필요|보충|채워")
+_CLAUSE = re.compile(r"(?<=[.!?。])\s+|\n+|지만|는데|[,;]")
+_RECOMMENDED = re.compile(r"추천메뉴\s*:\s*(.+)")
+_TAG = re.compile(r"<[^>]+>")
+SUMMARY_ACK = "네, 이전 대화 내용을 참고해서 이어갈게요."  # 요약 뒤에 붙이는 모델 응답
+
+
+def estimate_tokens(text):
+    """텍스트의 대략적인 토큰 수"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def find_nutrient_gaps(text):
+    """응답에서 부족하다고 언급된 영양소 목록 추출"""
+    gaps = []
+    for clause in _CLAUSE.split(_TAG.sub("", text)):
+        if _GAP_HINT.search(clause):
+            gaps.extend(n for n in NUTRIENTS if n in clause and n not in gaps)
+    return gaps
+
+
+def find_recommended_menu(text):
+    """응답의 "추천메뉴:" 줄에서 메뉴 이름 추출 (없으면 None)"""
+    match = _RECOMMENDED.search(_TAG.sub("", text))
+    return match.group(1).strip() if match else None
+
+
+def summarize(messages, health_condition):
+    """이전 대화를 건강 상태, 부족한 영양소, 언급/추천된 메뉴 위주로 요약"""
+    gaps, mentioned, recommended = [], [], []
+    for msg in messages:
+        if msg.is_user:
+            mentioned.extend(m for m in extract_menus(msg.content) if m not in mentioned)
+            continue
+        found = msg.nutrient_gaps or find_nutrient_gaps(msg.content)
+        gaps.extend(g for g in found if g not in gaps)
+        menu = msg.recommended_menu or find_recommended_menu(msg.content)
+        if menu and menu not in recommended:
+            recommended.append(menu)
+
+    lines = ["[이전 대화 요약]", f"- 건강 상태: {health_condition or '알 수 없음'}"]
+    if gaps:
+        lines.append(f"- 부족해 보이는 영양소: {', '.join(gaps)}")
+    if mentioned:
+        lines.append(f"- 사용자가 언급한 음식: {', '.join(mentioned)}")
+    if recommended:
+        lines.append(f"- 이미 추천한 메뉴: {', '.join(recommended)}")
+    return "\n".join(lines)
+
+
+class ContextWindow:
+    """모델에 보낼 대화 창 (요약 + 최근 메시지)과 예상 프롬프트 크기"""
+
+    def __init__(self, start, summary, recent, prompt_tokens, model_text=None):
+        self.start = start  # 그대로 보내는 첫 메시지의 인덱스
+        self.summary = summary
+        self.recent = recent
+        self.prompt_tokens = prompt_tokens
+        self.model_text = model_text or (lambda msg: msg.content)
+
+    def history(self):
+        """Gemini 대화 기록 형식으로 변환 (마지막 사용자 메시지 제외)"""
+        history = []
+        if self.summary:
+            history.append({"role": "user", "parts": [self.summary]})
+            history.append({"role": "model", "parts": [SUMMARY_ACK]})
+        history.extend(
+            {"role": "user", "parts": [msg.content]} if msg.is_user
+            else {"role": "model", "parts": [self.model_text(msg)]}
+            for msg in self.recent
+        )
+        return history
+
+
+def build_context_window(messages, health_condition, system_prompt, keep_turns, token_budget, model_text=None, prompt=None):
+    """최근 keep_turns턴은 그대로 두고 나머지는 요약하여 token_budget 안에 맞춘 대화 창 생성
+
+    messages의 마지막 항목은 이번에 보낼 사용자 메시지이며 (실제로 보낼 텍스트가 다르면 prompt로 전달),
+    model_text는 AI 메시지를 모델에 다시 보낼 형식으로 바꾸는 함수
+    """
+    model_text = model_text or (lambda msg: msg.content)
+    history = messages[:-1]
+    fixed_tokens = estimate_tokens(system_prompt) + estimate_tokens(
+        messages[-1].content if prompt is None else prompt
+    )
+    start = max(0, len(history) - keep_turns * 2)
+
+    while True:
+        # 대화 창은 항상 사용자 메시지로 시작
+        while start < len(history) and not history[start].is_user:
+            start += 1
+        summary = summarize(history[:start], health_condition) if start else None
+        recent = history[start:]
+        # 모델에 실제로 보내는 텍스트 기준 (AI 메시지는 model_text 형식)
+        prompt_tokens = fixed_tokens + sum(
+            estimate_tokens(m.content if m.is_user else model_text(m)) for m in recent
+        )
+        if summary:
+            prompt_tokens += estimate_tokens(summary) + estimate_tokens(SUMMARY_ACK)
+        if prompt_tokens <= token_budget or not recent:
+            return ContextWindow(start, summary, recent, prompt_tokens, model_text)
+        start += 1
@@ -0,0 +1,17 @@
+"""Gemini 모델 클라이언트 (google.generativeai는 처음 모델을 만들 때 불러옴)"""
+
+
+def create_model(api_key, model_name, system_instruction, response_schema):
+    """API 키를 설정하고 JSON 스키마로 응답하는 GenerativeModel 생성 (프로세스당 1회 호출)"""
+    # grpc/protobuf를 포함해 무거우므로 첫 사용자 메시지가 올 때까지 불러오지 않음
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(
+        model_name,
+        system_instruction=system_instruction,
+        generation_config=genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema
+        )
+    )
@@ -0,0 +1,90 @@
+"""외부 API 호출용 공용 HTTP 클라이언트 (연결 풀링, 타임아웃, 재시도)"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+CONNECT_TIMEOUT = 3.05  # 연결 타임아웃 (초)
+READ_TIMEOUT = 10  # 응답 대기 타임아웃 (초)
+MAX_ATTEMPTS = 3  # 최초 요청을 포함한 최대 시도 횟수
+BACKOFF_INITIAL = 0.2  # 첫 재시도 대기 시간 (초)
+BACKOFF_MAX = 2  # 재시도 대기 시간 상한 (초)
+POOL_CONNECTIONS = 10  # 호스트별 연결 풀 수
+POOL_MAXSIZE = 20  # 풀당 유지할 최대 연결 수
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def is_retryable(error):
+    """재시도할 오류인지 판단 (연결 오류, 타임아웃, 일시적인 서버 오류)"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRY_STATUS_CODES
+    return False
+
+
+class HttpClient:
+    """keep-alive 연결 풀을 공유하고 타임아웃과 재시도를 적용하는 HTTP 클라이언트
+
+    transport에 requests 어댑터를 넘기면 실제 네트워크 대신 해당 어댑터로 요청을 보냄
+    (로컬 대체 서버나 테스트용 어댑터 연결에 사용)
+    """
+
+    def __init__(self, transport=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_attempts=MAX_ATTEMPTS):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = transport or HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._retrying = Retrying(
+            stop=stop_after_attempt(max_attempts),
+            wait=wait_exponential_jitter(initial=BACKOFF_INITIAL, max=BACKOFF_MAX),
+            retry=retry_if_exception(is_retryable),
+            reraise=True
+        )
+
+    def _send(self, method, url, **kwargs):
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code in RETRY_STATUS_CODES:
+            response.raise_for_status()
+        return response
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """요청 전송 (일시적인 오류는 지수 백오프로 재시도)"""
+        return self._retrying(self._send, method, url, timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, url, **kwargs):
+        """GET 요청 전송"""
+        return self.request('GET', url, **kwargs)
+
+    def get_json(self, url, **kwargs):
+        """GET 요청 후 JSON 응답 반환 (실패 상태 코드는 예외 발생)"""
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        """연결 풀 정리"""
+        self.session.close()
+
+
+def get_http_client():
+    """프로세스 공용 HTTP 클라이언트 반환"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+
+def set_http_client(client):
+    """공용 HTTP 클라이언트 교체 (로컬 대체 서버 연결 등), 이전 클라이언트 반환"""
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
@@ -0,0 +1,167 @@
+"""역지오코딩 서비스 (공용 geocoder, 좌표 격자 캐시, 전역 속도 제한, 백그라운드 조회)
+
+geocoder 요청은 공용 HTTP 클라이언트(연결 풀, 타임아웃, 재시도)를 거침
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from caching import MemoryCache, SQLiteCache
+from metrics import metrics
+
+GEOCODER_USER_AGENT = "my_health_fit_eat"
+GEOCODER_DOMAIN = "nominatim.openstreetmap.org"
+GEOCODER_SCHEME = "https"
+GEOCODE_GRID = 0.001  # 좌표 반올림 격자 크기 (위경도, 약 100m)
+GEOCODE_CACHE_MAXSIZE = 2048
+GEOCODE_CACHE_TTL = 24 * 60 * 60  # 메모리 캐시 유지 시간 (초)
+GEOCODE_STORE_MAXSIZE = 100_000  # 디스크 저장소 최대 항목 수
+GEOCODE_STORE_TTL = 30 * 24 * 60 * 60  # 디스크 저장소 유지 시간 (초)
+GEOCODE_MIN_INTERVAL = 1.0  # Nominatim 이용 정책: 프로세스 전체에서 초당 1회
+GEOCODE_TIMEOUT = 5  # 역지오코딩 요청 타임아웃 (초)
+GEOCODE_WORKERS = 2
+
+
+class RateLimiter:
+    """호출 간 최소 간격을 보장하는 스레드 안전 속도 제한기"""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """다음 호출이 허용될 때까지 대기"""
+        with self._lock:
+            delay = self._next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = time.monotonic() + self.min_interval
+
+
+def client_adapter_factory(client):
+    """geopy가 client(http_client.HttpClient)로 요청하도록 하는 adapter_factory 생성
+
+    공용 클라이언트의 세션 설정을 그대로 쓰므로 geopy의 proxies/ssl_context 설정은 사용하지 않음
+    """
+    import requests
+    from geopy.adapters import AdapterHTTPError, BaseSyncAdapter
+    from geopy.exc import GeocoderParseError, GeocoderServiceError, GeocoderTimedOut, GeocoderUnavailable
+
+    class HttpClientAdapter(BaseSyncAdapter):
+        def get_text(self, url, *, timeout, headers):
+            return self._request(url, timeout, headers).text
+
+        def get_json(self, url, *, timeout, headers):
+            response = self._request(url, timeout, headers)
+            try:
+                return response.json()
+            except ValueError:
+                raise GeocoderParseError(f"JSON 응답을 해석할 수 없습니다: {response.text[:200]}")
+
+        def _request(self, url, timeout, headers):
+            # geopy 예외로 바꿔 Nominatim의 오류 처리(상태 코드별 예외 등)를 그대로 따름
+            try:
+                response = client.get(url, timeout=timeout, headers=headers)
+            except requests.Timeout:
+                raise GeocoderTimedOut("Service timed out")
+            except requests.ConnectionError as e:
+                raise GeocoderUnavailable(str(e))
+            except requests.HTTPError as e:
+                response = e.response
+            except requests.RequestException as e:
+                raise GeocoderServiceError(str(e))
+            if response.status_code >= 400:
+                raise AdapterHTTPError(
+                    f"Non-successful status code {response.status_code}",
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    text=response.text
+                )
+            return response
+
+    return lambda proxies, ssl_context: HttpClientAdapter(proxies=proxies, ssl_context=ssl_context)
+
+
+class LocationService:
+    """하나의 geocoder를 공유하며 좌표를 주소로 변환하는 서비스
+
+    결과는 좌표 격자 단위로 메모리(및 선택적으로 프로세스 간 공유 SQLite)에 캐시하고,
+    같은 격자에 대한 동시 조회는 하나의 요청으로 합침.
+    client를 생략하면 프로세스 공용 HTTP 클라이언트 사용
+    """
+
+    def __init__(self, db_path=None, client=None):
+        from geopy.geocoders import Nominatim
+
+        from http_client import get_http_client
+
+        self._geocoder = Nominatim(
+            user_agent=GEOCODER_USER_AGENT,
+            timeout=GEOCODE_TIMEOUT,
+            domain=GEOCODER_DOMAIN,
+            scheme=GEOCODER_SCHEME,
+            adapter_factory=client_adapter_factory(client or get_http_client())
+        )
+        self._limiter = RateLimiter(GEOCODE_MIN_INTERVAL)
+        self._cache = MemoryCache(maxsize=GEOCODE_CACHE_MAXSIZE, ttl=GEOCODE_CACHE_TTL)
+        self._store = (
+            SQLiteCache(db_path, "geocode", maxsize=GEOCODE_STORE_MAXSIZE, ttl=GEOCODE_STORE_TTL)
+            if db_path else None
+        )
+        self._executor = ThreadPoolExecutor(max_workers=GEOCODE_WORKERS, thread_name_prefix="geocode")
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+
+    @staticmethod
+    def cell_key(lat, lon):
+        """좌표를 격자 단위 캐시 키로 변환"""
+        return f"{round(lat / GEOCODE_GRID)}:{round(lon / GEOCODE_GRID)}"
+
+    def _lookup_cached(self, cell):
+        address = self._cache.get(cell)
+        if address is None and self._store is not None:
+            address = self._store.get(cell)
+            if address is not None:
+                self._cache.set(cell, address)
+        return address
+
+    def reverse(self, lat, lon):
+        """좌표에 해당하는 주소 반환 (주소를 찾지 못하면 None)"""
+        cell = self.cell_key(lat, lon)
+        address = self._lookup_cached(cell)
+        if address is None:
+            self._limiter.wait()
+            with metrics.timer("geocode.reverse"):
+                location = self._geocoder.reverse((lat, lon))
+            # 주소가 없는 좌표도 빈 문자열로 캐시하여 반복 조회를 막음
+            address = location.address if location else ""
+            self._cache.set(cell, address)
+            if self._store is not None:
+                self._store.set(cell, address)
+        return address or None
+
+    def reverse_async(self, lat, lon):
+        """백그라운드에서 주소를 조회하는 Future 반환"""
+        cell = self.cell_key(lat, lon)
+        address = self._lookup_cached(cell)
+        if address is not None:
+            future = Future()
+            future.set_result(address or None)
+            return future
+
+        with self._pending_lock:
+            future = self._pending.get(cell)
+            if future is None:
+                future = self._executor.submit(self.reverse, lat, lon)
+                self._pending[cell] = future
+                future.add_done_callback(lambda _: self._forget(cell))
+        return future
+
+    def _forget(self, cell):
+        with self._pending_lock:
+            self._pending.pop(cell, None)
+
+    def stats(self):
+        """메모리 캐시 통계 반환"""
+        return self._cache.stats()
@@ -0,0 +1,113 @@
+"""음식점 지도 생성 (같은 위치와 음식점 조합은 렌더링된 HTML을 재사용)
+
+folium/pydeck은 지도를 처음 그릴 때 불러옴
+"""
+import hashlib
+import json
+
+from caching import MemoryCache
+from metrics import metrics
+
+MAP_ZOOM = 15
+MAP_HEIGHT = 500  # 지도 높이 (px)
+MAP_HTML_CACHE_MAXSIZE = 128
+MAP_HTML_CACHE_TTL = 60 * 60  # 렌더링된 지도 HTML 유지 시간 (초)
+
+_html_cache = MemoryCache(maxsize=MAP_HTML_CACHE_MAXSIZE, ttl=MAP_HTML_CACHE_TTL)
+metrics.register_cache("map_html", _html_cache.stats)
+
+
+def map_key(restaurants, lat, lon):
+    """현재 위치와 음식점 place_id 조합으로 지도 캐시 키 생성"""
+    place_ids = [r.get('place_id') or r['name'] for r in restaurants]
+    payload = json.dumps([round(lat, 6), round(lon, 6), place_ids], ensure_ascii=False)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def build_folium_map(restaurants, lat, lon):
+    """현재 위치와 음식점 마커가 표시된 folium 지도 생성"""
+    import folium
+
+    m = folium.Map(location=[lat, lon], zoom_start=MAP_ZOOM)
+    
+    # 현재 위치 마커
+    folium.Marker(
+        [lat, lon],
+        popup="현재 위치",
+        icon=folium.Icon(color='red', icon='info-sign')
+    ).add_to(m)
+    
+    # 음식점 마커
+    for restaurant in restaurants:
+        location = restaurant['geometry']['location']
+        name = restaurant['name']
+        rating = restaurant.get('rating', '평점 없음')
+        address = restaurant.get('vicinity', '주소 정보 없음')
+        
+        popup_html = f"""
+        <div style='width: 200px'>
+            <b>{name}</b><br>
+            평점: {rating}⭐<br>
+            주소: {address}
+        </div>
+        """
+        
+        folium.Marker(
+            [location['lat'], location['lng']],
+            popup=folium.Popup(popup_html, max_width=300),
+            icon=folium.Icon(color='green')
+        ).add_to(m)
+    
+    return m
+
+
+def render_map_html(restaurants, lat, lon):
+    """folium 지도를 HTML로 렌더링 (같은 지도는 캐시된 HTML 반환)"""
+    key = map_key(restaurants, lat, lon)
+    html = _html_cache.get(key)
+    if html is None:
+        import folium
+
+        figure = folium.Figure().add_child(build_folium_map(restaurants, lat, lon))
+        html = figure.render()
+        _html_cache.set(key, html)
+    return html
+
+
+def build_pydeck_map(restaurants, lat, lon):
+    """마커 대신 점 레이어로 그리는 가벼운 pydeck 지도 생성"""
+    import pydeck as pdk
+
+    points = [{
+        'name': "현재 위치",
+        'lat': lat,
+        'lng': lon,
+        'rating': '-',
+        'vicinity': '-',
+        'color': [255, 0, 0]
+    }]
+    for restaurant in restaurants:
+        location = restaurant['geometry']['location']
+        points.append({
+            'name': restaurant['name'],
+            'lat': location['lat'],
+            'lng': location['lng'],
+            'rating': restaurant.get('rating', '평점 없음'),
+            'vicinity': restaurant.get('vicinity', '주소 정보 없음'),
+            'color': [0, 160, 0]
+        })
+    
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=points,
+        get_position=['lng', 'lat'],
+        get_fill_color='color',
+        get_radius=30,
+        radius_min_pixels=6,
+        pickable=True
+    )
+    return pdk.Deck(
+        layers=[layer],
+        initial_view_state=pdk.ViewState(latitude=lat, longitude=lon, zoom=MAP_ZOOM - 1),
+        tooltip={'html': "<b>{name}</b><br>평점: {rating}⭐<br>주소: {vicinity}"}
+    )
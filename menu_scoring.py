@@ -0,0 +1,72 @@
+"""건강 상태별 메뉴 점수 계산 (영양소 가중치 벡터로 후보 메뉴를 한 번에 채점)"""
+import numpy as np
+
+from nutrition import DAILY_REFERENCE, MEALS_PER_DAY, NUTRIENTS, TARGET_NUTRIENTS
+
+# 건강 상태별 영양소 가중치 (한 끼 기준량 대비 비율에 곱함, 음수는 감점)
+BASE_WEIGHTS = {
+    'kcal': -0.1, 'protein_g': 0.5, 'fat_g': -0.2, 'fiber_g': 0.5, 'sugar_g': -0.3,
+    'sodium_mg': -0.5, 'iron_mg': 0.2, 'calcium_mg': 0.2, 'vitamin_c_mg': 0.2, 'potassium_mg': 0.2,
+}
+CONDITION_WEIGHTS = {
+    "이상 없음": {},
+    "당뇨": {'sugar_g': -1.5, 'carbohydrate_g': -1.0, 'fiber_g': 1.0, 'kcal': -0.3},
+    "빈혈": {'iron_mg': 2.0, 'vitamin_c_mg': 0.7, 'protein_g': 0.6, 'calcium_mg': -0.2},
+    "고혈압": {'sodium_mg': -2.0, 'potassium_mg': 1.0, 'fat_g': -0.4, 'calcium_mg': 0.3},
+    "비만": {'kcal': -1.5, 'fat_g': -0.8, 'sugar_g': -0.8, 'carbohydrate_g': -0.4, 'fiber_g': 0.6},
+}
+GAP_WEIGHT = 0.5  # 식사 분석에서 부족했던 영양소에 더하는 가중치
+
+
+class MenuScore:
+    """후보 메뉴 하나의 점수"""
+
+    def __init__(self, menu, food, score):
+        self.menu = menu  # 사용자가 말한 메뉴 이름
+        self.food = food  # 성분표의 음식 이름
+        self.score = score
+
+
+class MenuScorer:
+    """건강 상태와 부족 영양소를 반영한 가중치 벡터로 후보 메뉴 순위 계산
+
+    성분표 전체를 한 끼 기준량 대비 비율로 미리 바꿔 두고,
+    순위 계산은 후보 행을 골라 가중치 벡터와 한 번 곱하는 것으로 끝냄
+    """
+
+    def __init__(self, food_index):
+        self.index = food_index
+        self.columns = list(NUTRIENTS)
+        per_meal = np.array([DAILY_REFERENCE[c] for c in self.columns], dtype=np.float64) / MEALS_PER_DAY
+        self._scaled = food_index.values / per_meal
+        self._weights = {
+            condition: self._vector(dict(BASE_WEIGHTS, **{
+                c: BASE_WEIGHTS.get(c, 0) + w for c, w in overrides.items()
+            }))
+            for condition, overrides in CONDITION_WEIGHTS.items()
+        }
+
+    def _vector(self, weights):
+        return np.array([weights.get(c, 0.0) for c in self.columns], dtype=np.float64)
+
+    def weights(self, condition, gaps=()):
+        """건강 상태 가중치에 부족 영양소 가중치를 더한 벡터"""
+        vector = self._weights.get(condition, self._weights["이상 없음"]).copy()
+        for gap in gaps:
+            for position, column in enumerate(self.columns):
+                label = NUTRIENTS[column][0]
+                if column in TARGET_NUTRIENTS and (gap in label or label in gap):
+                    vector[position] += GAP_WEIGHT
+        return vector
+
+    def rank(self, menus, condition, gaps=()):
+        """후보 메뉴를 점수 순으로 정렬 (성분표 이름/별칭과 정확히 일치하지 않는 메뉴가 있으면 빈 목록)
+
+        부분 일치를 허용하면 "김치찌개 칼로리가 얼마야" 같은 질문도 메뉴로 채점되므로 정확히 일치해야 함
+        """
+        rows = [self.index.lookup_exact(menu) for menu in menus]
+        if not rows or None in rows:
+            return []
+        scores = self._scaled[rows] @ self.weights(condition, gaps)
+        order = np.argsort(-scores, kind='stable')
+        return [MenuScore(menus[i], self.index.names[rows[i]], float(scores[i])) for i in order]
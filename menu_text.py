@@ -0,0 +1,41 @@
+"""사용자 메시지에서 메뉴 이름 추출 및 정규화"""
+import re
+
+# 메뉴 사이 구분자 (쉼표, 줄바꿈, 나열 조사 등)
+_SEPARATORS = re.compile(r"[,，、/\n·+&]|(?:이랑|랑|하고|그리고|에다가|및)\s|(?<=\S{2})[와과]\s")
+# 메뉴 뒤에 붙는 서술어 ("을 먹었어", "먹고 싶어" 등)
+_PREDICATE = re.compile(r"(?<=\S)(?:\s*(?:을|를)\s*|\s+|(?=먹))(?:먹|드셨|드시|마셨|마시|싶|했|해|할|주문|시켜).*$")
+# 후보 나열 뒤에 붙는 선택 질문 ("중에 뭐가 좋을까?" 등)
+_CHOICE_QUESTION = re.compile(r"\s+(?:중에서|중에|중|가운데)(?:\s.*)?$")
+# 메뉴 앞에 붙는 시간 표현 ("오늘 아침에" 등)
+_TIME_PREFIX = re.compile(r"^(?:오늘|어제|아까|방금|아침|점심|저녁|야식|간식)(?:에|으로|은|는|엔)?\s*")
+# 메뉴 끝에 남은 조사 (음식 이름을 깨뜨리지 않는 것만)
+_TRAILING_PARTICLE = re.compile(r"(?:을|를|이랑|랑|하고|에다가|도요|요)$")
+_NOISE = re.compile(r"[^\w]")
+
+
+def normalize_menu(token):
+    """메뉴 하나를 정규화 (시간 표현, 서술어, 조사, 공백 제거)"""
+    token = _CHOICE_QUESTION.sub("", token.strip())
+    token = _PREDICATE.sub("", token)
+    previous = None
+    while previous != token:
+        previous = token
+        token = _TIME_PREFIX.sub("", token.strip())
+    token = _NOISE.sub("", token)
+    return _TRAILING_PARTICLE.sub("", token)
+
+
+def extract_menus(text):
+    """메시지에 나열된 메뉴 목록 추출 (등장 순서 유지, 중복 제거)"""
+    menus = []
+    for token in _SEPARATORS.split(text):
+        menu = normalize_menu(token)
+        if menu and menu not in menus:
+            menus.append(menu)
+    return menus
+
+
+def meal_key(text):
+    """순서와 표기 차이를 무시한 메뉴 조합 키 (정렬, 중복 제거)"""
+    return tuple(sorted(set(extract_menus(text))))
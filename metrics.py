@@ -0,0 +1,226 @@
+"""핫패스 계측 (단계별 지연 시간 히스토그램, 호출 수, 캐시 적중률, 외부 호출 오류 수, 프롬프트 크기 등 측정값, 작업 제한 카운터)
+
+비활성화하면 timer는 공용 no-op 컨텍스트를, timed는 원래 함수를 그대로 반환함
+"""
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+METRICS_ENABLED = os.environ.get("HEALTHFITEAT_METRICS", "1") != "0"
+METRICS_PATH = os.environ.get("HEALTHFITEAT_METRICS_PATH", ".cache/metrics.json")
+EXPORT_INTERVAL = 60  # JSON 파일로 내보내는 최소 간격 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # 히스토그램 상한 (초)
+TOKEN_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000)  # 토큰 수 히스토그램 상한
+RECENT_SAMPLES = 1024  # 백분위수 계산에 쓰는 최근 측정값 수
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """고정 구간 히스토그램 (최근 측정값으로 p50/p95 계산, 기본 구간은 지연 시간 초)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def percentile(self, q):
+        if not self._recent:
+            return 0.0
+        samples = sorted(self._recent)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def summary(self):
+        labels = [f"le_{b}" for b in self.buckets] + ["inf"]
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max': self.max,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # st.rerun/st.stop 같은 제어 흐름 예외(BaseException)는 오류로 세지 않음
+        failed = exc_type is not None and issubclass(exc_type, Exception)
+        self._metrics.observe(self._name, time.perf_counter() - self._started, failed)
+        return False
+
+
+class Metrics:
+    """프로세스 전체에서 공유하는 스레드 안전 계측 저장소"""
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._calls = {}
+        self._errors = {}
+        self._values = {}
+        self._caches = {}
+        self._counters = {}
+        self._last_export = 0.0
+
+    def timer(self, name):
+        """with 블록의 실행 시간을 name 단계로 기록 (예외가 나면 오류로 기록)"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """함수 실행 시간을 name 단계로 기록하는 데코레이터"""
+        def decorator(fn):
+            if not self.enabled:
+                return fn
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with _Timer(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe(self, name, seconds, failed=False):
+        """단계 하나의 측정값 기록"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+            self._calls[name] = self._calls.get(name, 0) + 1
+            if failed:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    def record(self, name, value, buckets=TOKEN_BUCKETS):
+        """지연 시간이 아닌 측정값(프롬프트 토큰 수 등)을 name 히스토그램에 기록"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._values.get(name)
+            if histogram is None:
+                histogram = self._values[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def error(self, name):
+        """예외를 전파하지 않고 처리한 외부 호출 오류 기록"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._errors[name] = self._errors.get(name, 0) + 1
+
+    def register_cache(self, name, stats):
+        """스냅샷에 포함할 캐시 통계 함수 등록"""
+        with self._lock:
+            self._caches[name] = stats
+
+    def register_counters(self, name, stats):
+        """스냅샷에 포함할 작업 카운터 함수 등록 (제한, 중복 제거, 실패 수 등)"""
+        with self._lock:
+            self._counters[name] = stats
+
+    @staticmethod
+    def _collect(sources, kind):
+        collected = {}
+        for name, stats in sources.items():
+            try:
+                collected[name] = stats()
+            except Exception:
+                logger.exception("%s 통계 수집 실패: %s", kind, name)
+        return collected
+
+    def snapshot(self):
+        """현재 계측값을 JSON으로 직렬화할 수 있는 dict로 반환"""
+        with self._lock:
+            stages = {name: h.summary() for name, h in self._histograms.items()}
+            values = {name: h.summary() for name, h in self._values.items()}
+            calls = dict(self._calls)
+            errors = dict(self._errors)
+            caches = dict(self._caches)
+            counters = dict(self._counters)
+        return {
+            'enabled': self.enabled,
+            'timestamp': time.time(),
+            'stages': stages,
+            'calls': calls,
+            'errors': errors,
+            'values': values,
+            'caches': self._collect(caches, "캐시"),
+            'counters': self._collect(counters, "작업"),
+        }
+
+    def export(self, path=METRICS_PATH):
+        """스냅샷을 JSON 파일로 저장 (쓰는 도중 읽어도 깨지지 않도록 교체 방식)"""
+        snapshot = self.snapshot()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        logger.info("metrics exported to %s (%d stages)", path, len(snapshot['stages']))
+        return snapshot
+
+    def maybe_export(self, path=METRICS_PATH, interval=EXPORT_INTERVAL):
+        """마지막으로 내보낸 뒤 interval초가 지났으면 JSON 파일로 저장"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < interval:
+                return
+            self._last_export = now
+        try:
+            self.export(path)
+        except OSError:
+            logger.exception("metrics export failed")
+
+    def reset(self):
+        """측정값 초기화 (등록된 캐시는 유지)"""
+        with self._lock:
+            self._histograms.clear()
+            self._calls.clear()
+            self._errors.clear()
+            self._values.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,152 @@
+"""Gemini 호출 제한 (프로세스 전역 토큰 버킷, 동시 실행 수 제한, 진행 중 요청 합치기)"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ModelThrottled(Exception):
+    """요청이 많아 제한 시간 안에 모델 호출을 시작하지 못함"""
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """토큰 하나를 얻을 때까지 최대 timeout초 대기 (얻지 못하면 False)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                delay = (1 - self._tokens) / self.rate
+            if now + delay > deadline:
+                return False
+            time.sleep(delay)
+
+
+class PendingResponse:
+    """작업 스레드에서 생성 중인 응답 (스트리밍된 텍스트를 누적)"""
+
+    def __init__(self, content):
+        self.content = content
+        self.text = ""
+        self.queued = True
+        self.done = False
+        self.error = None
+        self._version = 0
+        self._changed = threading.Condition()
+
+    def _notify(self):
+        self._version += 1
+        self._changed.notify_all()
+
+    def start(self):
+        """대기열을 벗어나 생성 시작"""
+        with self._changed:
+            self.queued = False
+            self._notify()
+
+    def append(self, text):
+        """생성된 텍스트 추가"""
+        if text:
+            with self._changed:
+                self.text += text
+                self._notify()
+
+    def reset(self):
+        """지금까지 생성된 텍스트 폐기 (다시 생성할 때 사용)"""
+        with self._changed:
+            self.text = ""
+            self._notify()
+
+    def finish(self, error=None):
+        """생성 완료 (실패한 경우 error 기록)"""
+        with self._changed:
+            self.error = error
+            self.done = True
+            self._notify()
+
+    def wait(self, version, timeout):
+        """version 이후 변경이 생길 때까지 최대 timeout초 대기 후 현재 version 반환"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout=timeout)
+            return self._version
+
+
+class ModelGate:
+    """모델 호출을 작업 스레드에서 실행하며 속도와 동시 실행 수를 제한
+
+    같은 키로 진행 중인 요청이 있으면 새 요청을 보내지 않고 그 응답을 공유함
+    """
+
+    def __init__(self, rate, burst, max_concurrent, max_queued, queue_timeout):
+        self.queue_timeout = queue_timeout
+        self.max_pending = max_concurrent + max_queued
+        self._bucket = TokenBucket(rate, burst)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_pending, thread_name_prefix="gemini")
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.counters = {'started': 0, 'deduplicated': 0, 'throttled': 0, 'failed': 0}
+
+    def find(self, key):
+        """같은 키로 진행 중인 요청 반환 (없으면 None)"""
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.counters['deduplicated'] += 1
+            return pending
+
+    def submit(self, key, content, generate):
+        """generate(pending)을 작업 스레드에서 실행하고 PendingResponse 반환"""
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.counters['deduplicated'] += 1
+                return pending
+            if len(self._inflight) >= self.max_pending:
+                self.counters['throttled'] += 1
+                raise ModelThrottled("대기 중인 요청이 너무 많습니다.")
+            pending = PendingResponse(content)
+            self._inflight[key] = pending
+        deadline = time.monotonic() + self.queue_timeout
+        self._executor.submit(self._run, key, pending, generate, deadline)
+        return pending
+
+    def _run(self, key, pending, generate, deadline):
+        try:
+            if not self._slots.acquire(timeout=max(0, deadline - time.monotonic())):
+                raise ModelThrottled("동시에 처리 중인 요청이 너무 많습니다.")
+            try:
+                if not self._bucket.acquire(timeout=max(0, deadline - time.monotonic())):
+                    raise ModelThrottled("요청 속도 제한에 걸렸습니다.")
+                with self._lock:
+                    self.counters['started'] += 1
+                pending.start()
+                generate(pending)
+            finally:
+                self._slots.release()
+            pending.finish()
+        except Exception as e:
+            with self._lock:
+                self.counters['throttled' if isinstance(e, ModelThrottled) else 'failed'] += 1
+            pending.finish(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        """호출 통계 반환"""
+        with self._lock:
+            return dict(self.counters, inflight=len(self._inflight))
@@ -0,0 +1,130 @@
+"""로컬 영양 정보 (음식 영양 성분표, 메뉴 이름 색인, 부족/과다 영양소 계산)"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from menu_text import normalize_menu
+
+FOOD_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "foods.csv")
+
+# 성분표 열 이름: (표시 이름, 단위)
+NUTRIENTS = {
+    'kcal': ("열량", "kcal"),
+    'carbohydrate_g': ("탄수화물", "g"),
+    'protein_g': ("단백질", "g"),
+    'fat_g': ("지방", "g"),
+    'fiber_g': ("식이섬유", "g"),
+    'sugar_g': ("당류", "g"),
+    'sodium_mg': ("나트륨", "mg"),
+    'iron_mg': ("철분", "mg"),
+    'calcium_mg': ("칼슘", "mg"),
+    'vitamin_c_mg': ("비타민C", "mg"),
+    'potassium_mg': ("칼륨", "mg"),
+}
+# 성인 1일 기준량 (한국인 영양소 섭취기준을 단순화한 값)
+DAILY_REFERENCE = {
+    'kcal': 2000, 'carbohydrate_g': 300, 'protein_g': 55, 'fat_g': 54, 'fiber_g': 25,
+    'sugar_g': 50, 'sodium_mg': 2000, 'iron_mg': 12, 'calcium_mg': 700,
+    'vitamin_c_mg': 100, 'potassium_mg': 3500,
+}
+TARGET_NUTRIENTS = ('protein_g', 'fiber_g', 'iron_mg', 'calcium_mg', 'vitamin_c_mg', 'potassium_mg')
+LIMIT_NUTRIENTS = ('fat_g', 'sugar_g', 'sodium_mg')
+DEFICIENT_RATIO = 0.7  # 기준량 대비 이 비율보다 적으면 부족
+EXCESS_RATIO = 1.2  # 기준량 대비 이 비율보다 많으면 과다
+MEALS_PER_DAY = 3
+MIN_PARTIAL_MATCH = 2  # 부분 일치로 인정할 음식 이름 최소 길이
+
+
+class NutritionReport:
+    """입력한 식사의 추정 영양 합계와 부족/과다 영양소"""
+
+    def __init__(self, matched, unknown, totals, reference, deficient, excess):
+        self.matched = matched  # [(입력 메뉴, 성분표 음식 이름)]
+        self.unknown = unknown  # 성분표에서 찾지 못한 메뉴
+        self.totals = totals
+        self.reference = reference
+        self.deficient = deficient  # 부족해 보이는 영양소 표시 이름
+        self.excess = excess  # 많아 보이는 영양소 표시 이름
+
+    def to_prompt(self):
+        """모델에 함께 보낼 짧은 영양 추정 요약"""
+        foods = ", ".join(food for _, food in self.matched)
+        amounts = " · ".join(
+            f"{NUTRIENTS[column][0]} {self.totals[column]:,.0f}{NUTRIENTS[column][1]}"
+            for column in ('kcal', 'protein_g', 'fiber_g', 'sodium_mg', 'iron_mg', 'calcium_mg', 'vitamin_c_mg')
+        )
+        lines = [f"[로컬 영양 추정 (참고용) - {foods}: {amounts}"]
+        if self.deficient:
+            lines.append(f" / 부족해 보임: {', '.join(self.deficient)}")
+        if self.excess:
+            lines.append(f" / 많아 보임: {', '.join(self.excess)}")
+        if self.unknown:
+            lines.append(f" / 성분표에 없는 메뉴: {', '.join(self.unknown)}")
+        return "".join(lines) + "]"
+
+
+class FoodIndex:
+    """음식 영양 성분표와 메뉴 이름 색인
+
+    성분표는 pyarrow 기반 DataFrame으로 읽고, 계산용 값은 NumPy 행렬로 보관함
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.names = table['name'].tolist()
+        self.values = table[list(NUTRIENTS)].to_numpy(dtype=np.float64)
+        self._index = {}
+        for row, (name, aliases) in enumerate(zip(self.names, table['aliases'].fillna("").tolist())):
+            for token in [name, *aliases.split("|")]:
+                key = normalize_menu(token)
+                if key:
+                    self._index.setdefault(key, row)
+        self._by_length = sorted(
+            (key for key in self._index if len(key) >= MIN_PARTIAL_MATCH), key=len, reverse=True
+        )
+
+    @classmethod
+    def load(cls, path=FOOD_TABLE_PATH):
+        """CSV 성분표 읽기"""
+        return cls(pd.read_csv(path, dtype_backend="pyarrow"))
+
+    def lookup(self, menu):
+        """메뉴에 해당하는 성분표 행 번호 (정확히 일치하지 않으면 가장 긴 부분 일치, 없으면 None)"""
+        key = normalize_menu(menu)
+        row = self._index.get(key)
+        if row is None:
+            # 성분표 이름은 수백 개 수준이라 매번 훑어도 충분히 빠르며, 사용자 입력을 기억해 두지 않음
+            row = next((self._index[name] for name in self._by_length if name in key), None)
+        return row
+
+    def lookup_exact(self, menu):
+        """이름 또는 별칭이 정확히 일치하는 성분표 행 번호 (없으면 None)"""
+        return self._index.get(normalize_menu(menu))
+
+    def analyze(self, menus):
+        """메뉴 목록의 영양 합계를 계산하고 먹은 끼니 수에 맞춘 기준량과 비교"""
+        matched, unknown, rows = [], [], []
+        for menu in menus:
+            row = self.lookup(menu)
+            if row is None:
+                unknown.append(menu)
+            else:
+                matched.append((menu, self.names[row]))
+                rows.append(row)
+
+        totals = self.values[rows].sum(axis=0) if rows else np.zeros(len(NUTRIENTS))
+        meals = min(max(len(rows), 1), MEALS_PER_DAY)
+        reference = np.array([DAILY_REFERENCE[c] for c in NUTRIENTS]) * meals / MEALS_PER_DAY
+        ratios = dict(zip(NUTRIENTS, totals / reference))
+
+        deficient = [NUTRIENTS[c][0] for c in TARGET_NUTRIENTS if rows and ratios[c] < DEFICIENT_RATIO]
+        excess = [NUTRIENTS[c][0] for c in LIMIT_NUTRIENTS if rows and ratios[c] > EXCESS_RATIO]
+        return NutritionReport(
+            matched,
+            unknown,
+            dict(zip(NUTRIENTS, totals.tolist())),
+            dict(zip(NUTRIENTS, reference.tolist())),
+            deficient,
+            excess
+        )
@@ -0,0 +1,39 @@
+"""후보 작업 미리 실행 (키 단위 중복 방지, 대기 작업 수 제한)"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Prefetcher:
+    """결과가 필요해지기 전에 작업을 백그라운드에서 미리 실행하는 작업 풀
+
+    같은 키의 작업은 한 번만 실행하며, 진행 중인 작업이 max_pending개를 넘으면
+    새 작업은 건너뜀 (결과는 작업 함수가 공용 캐시에 저장)
+    """
+
+    def __init__(self, max_workers, max_pending):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.counters = {'submitted': 0, 'skipped': 0}
+
+    def submit(self, key, fn, *args):
+        """작업 예약 (이미 진행 중이거나 대기 작업이 가득 차면 None)"""
+        with self._lock:
+            if key in self._inflight or len(self._inflight) >= self.max_pending:
+                self.counters['skipped'] += 1
+                return None
+            future = self._executor.submit(fn, *args)
+            self._inflight[key] = future
+            self.counters['submitted'] += 1
+        future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def stats(self):
+        """작업 통계 반환"""
+        with self._lock:
+            return dict(self.counters, inflight=len(self._inflight))
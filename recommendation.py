@@ -0,0 +1,173 @@
+"""모델 응답의 구조화 출력 (JSON 스키마, pydantic 검증, 스트리밍 중 답변 추출)"""
+import json
+import re
+
+from pydantic import BaseModel, PrivateAttr, ValidationError, field_validator
+
+from context_window import find_nutrient_gaps, find_recommended_menu
+from session_memory import ChatMessage
+
+MAX_MENU_LENGTH = 30  # 음식점 검색어로 쓸 메뉴 이름 최대 길이
+EMPTY_REPLY = "죄송합니다. 답변이 중간에 끊겼습니다. 다시 질문해 주세요."  # JSON에서 답변을 찾지 못했을 때 보여줄 문구
+
+# Gemini response_schema (JSON 모드로 응답 생성)
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "reply": {
+            "type": "STRING",
+            "description": "사용자에게 보여줄 답변 전체 (HTML span 태그 포함 가능)"
+        },
+        "nutrient_gaps": {
+            "type": "ARRAY",
+            "items": {"type": "STRING"},
+            "description": "부족해 보이는 영양소 이름 목록"
+        },
+        "recommended_menu": {
+            "type": "STRING",
+            "nullable": True,
+            "description": "2단계에서 가장 추천하는 메뉴 이름만 (1단계에서는 null)"
+        },
+        "advice": {
+            "type": "STRING",
+            "nullable": True,
+            "description": "건강 상태와 관련된 한 줄 조언"
+        }
+    },
+    "required": ["reply", "nutrient_gaps"]
+}
+
+STRUCTURED_OUTPUT_INSTRUCTION = """
+
+응답 형식:
+- 항상 JSON 객체 하나로만 응답하기
+- "reply": 사용자에게 보여줄 답변 전체 (위의 말투와 형식, 빨간색 span 태그 그대로 사용)
+- "nutrient_gaps": 부족해 보이는 영양소 이름 목록 (없으면 빈 목록)
+- "recommended_menu": 2단계에서 가장 추천하는 메뉴 이름만 작성 (예: "된장찌개"), 1단계에서는 null
+- "advice": 건강 상태와 관련된 한 줄 조언 (없으면 null)"""
+
+_TAG = re.compile(r"<[^>]+>")
+_REPLY_START = re.compile(r'"reply"\s*:\s*"')
+_ESCAPES = {'n': "\n", 't': "\t", 'r': "\r", 'b': "\b", 'f': "\f"}
+
+
+def clean_menu(menu):
+    """음식점 검색어로 쓸 수 있게 메뉴 이름 정리 (쓸 수 없으면 None)"""
+    if not menu:
+        return None
+    menu = _TAG.sub("", menu).replace("추천메뉴:", "").strip()
+    menu = menu.splitlines()[0].strip(" \"'.,!~*") if menu else ""
+    if not menu or len(menu) > MAX_MENU_LENGTH:
+        return None
+    return menu
+
+
+class MealAdvice(BaseModel):
+    """검증된 모델 응답"""
+    reply: str
+    nutrient_gaps: list[str] = []
+    recommended_menu: str | None = None
+    advice: str | None = None
+    _fallback: bool = PrivateAttr(False)
+
+    @property
+    def fallback(self):
+        """스키마 검증에 실패해 텍스트에서 값을 추출한 응답인지 (캐시하지 않음)"""
+        return self._fallback
+
+    @field_validator("recommended_menu")
+    @classmethod
+    def _clean_recommended_menu(cls, value):
+        return clean_menu(value)
+
+    def to_record(self):
+        """채팅 기록에 저장할 메시지 레코드로 변환"""
+        return ChatMessage(
+            content=self.reply,
+            is_user=False,
+            recommended_menu=self.recommended_menu,
+            nutrient_gaps=tuple(self.nutrient_gaps),
+            advice=self.advice
+        )
+
+
+def parse_response(text):
+    """모델 응답을 검증하여 MealAdvice로 변환
+
+    검증에 실패하면 JSON 형태(최대 토큰에서 잘렸거나 필수 필드가 null인 경우)는 읽을 수 있는 필드와
+    "reply" 값만 쓰고, JSON이 아니면 텍스트 전체를 답변으로 보며,
+    어느 쪽이든 "추천메뉴:" 줄과 영양소 언급에서 빠진 값을 추출함
+    """
+    try:
+        return MealAdvice.model_validate_json(text)
+    except ValidationError:
+        pass
+    data = {}
+    if text.lstrip().startswith("{"):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            pass
+        if not isinstance(data, dict):
+            data = {}
+        reply = data.get("reply")
+        if not isinstance(reply, str):
+            reply = extract_partial_reply(text)
+        reply = reply or EMPTY_REPLY
+    else:
+        reply = text
+    gaps = data.get("nutrient_gaps")
+    if not isinstance(gaps, list) or not all(isinstance(g, str) for g in gaps):
+        gaps = find_nutrient_gaps(reply)
+    menu = data.get("recommended_menu")
+    advice = data.get("advice")
+    result = MealAdvice(
+        reply=reply,
+        nutrient_gaps=gaps,
+        recommended_menu=menu if isinstance(menu, str) else find_recommended_menu(reply),
+        advice=advice if isinstance(advice, str) else None
+    )
+    result._fallback = True
+    return result
+
+
+def to_model_text(record):
+    """채팅 기록의 AI 메시지를 모델이 생성한 형식(JSON)으로 되돌림"""
+    return json.dumps({
+        "reply": record.content,
+        "nutrient_gaps": list(record.nutrient_gaps),
+        "recommended_menu": record.recommended_menu,
+        "advice": record.advice
+    }, ensure_ascii=False)
+
+
+def extract_partial_reply(text):
+    """스트리밍 중인 JSON에서 지금까지 생성된 "reply" 값 추출"""
+    if not text.lstrip().startswith("{"):
+        return text
+    match = _REPLY_START.search(text)
+    if not match:
+        return ""
+    chars = []
+    i = match.end()
+    while i < len(text):
+        char = text[i]
+        if char == '"':
+            break
+        if char == "\\":
+            if i + 1 >= len(text):
+                break
+            escaped = text[i + 1]
+            if escaped == "u":
+                if i + 6 > len(text):
+                    break
+                chars.append(chr(int(text[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            chars.append(_ESCAPES.get(escaped, escaped))
+            i += 2
+            continue
+        chars.append(char)
+        i += 1
+    # 이모지 등 서로게이트 쌍을 합치고 아직 짝이 오지 않은 절반은 버림
+    return "".join(chars).encode("utf-16-le", "surrogatepass").decode("utf-16-le", "ignore")
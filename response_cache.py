@@ -0,0 +1,42 @@
+"""1단계 식사 분석 응답 캐시 (건강 상태 + 정규화된 메뉴 조합 기준)"""
+import threading
+
+from caching import make_cache
+from menu_text import meal_key
+
+
+class ResponseCache:
+    """같은 건강 상태와 메뉴 조합의 식사 분석 응답을 재사용하는 캐시
+
+    적중할 때마다 원래 생성에 걸렸던 시간을 절약한 시간으로 누적함
+    """
+
+    def __init__(self, maxsize, ttl):
+        self._cache = make_cache("meal_analysis", maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def key(health_condition, text):
+        """캐시 키 생성 (메뉴를 찾지 못하면 None)"""
+        menus = meal_key(text)
+        return (health_condition, menus) if menus else None
+
+    def get(self, key):
+        """캐시된 응답 반환 (없으면 None)"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        response, latency = entry
+        with self._lock:
+            self.saved_seconds += latency
+        return response
+
+    def set(self, key, response, latency):
+        """응답과 생성에 걸린 시간(초) 저장"""
+        self._cache.set(key, (response, latency))
+
+    def stats(self):
+        """적중률과 절약한 시간을 포함한 캐시 통계 반환"""
+        with self._lock:
+            return dict(self._cache.stats(), saved_seconds=self.saved_seconds)
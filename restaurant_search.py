@@ -0,0 +1,195 @@
+"""주변 음식점 검색 엔진 (여러 메뉴 동시 검색, 페이지 처리, 중복 제거, 거리/평점 기반 순위)"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from metrics import metrics
+
+PLACES_NEARBY_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+SEARCH_RADII = (1000, 2000, 5000)  # 결과가 부족하면 차례로 넓힐 검색 반경 (m)
+MIN_RESULTS = 5  # 반경을 넓히지 않아도 되는 최소 결과 수
+MAX_PAGES = 3  # Places Nearby Search가 제공하는 최대 페이지 수 (페이지당 20개)
+PAGE_TOKEN_DELAY = 2.0  # next_page_token이 유효해질 때까지 기다리는 시간 (초)
+PAGE_TOKEN_ATTEMPTS = 3
+SEARCH_WORKERS = 4  # 여러 메뉴를 동시에 검색할 작업 스레드 수 (모든 세션이 공유)
+PAGE_WORKERS = 2  # 다음 페이지를 백그라운드에서 받아 캐시를 채우는 작업 스레드 수
+CACHEABLE_STATUSES = ('OK', 'ZERO_RESULTS')
+# 캐시에 남길 검색 결과 필드 (표시에 쓰는 이름/위치/평점/주소/place_id와 순위 계산용 리뷰 수)
+PLACE_FIELDS = ('place_id', 'name', 'rating', 'user_ratings_total', 'vicinity')
+
+# 순위 점수 가중치 (거리, 평점, 리뷰 수)
+DISTANCE_WEIGHT = 0.5
+RATING_WEIGHT = 0.35
+REVIEW_WEIGHT = 0.15
+RATING_PRIOR = 3.5  # 리뷰가 적은 음식점의 평점을 끌어당길 기준 평점
+RATING_PRIOR_COUNT = 20  # 기준 평점에 주는 가상 리뷰 수
+EARTH_RADIUS_M = 6371008.8
+
+
+class PlacesSearchError(Exception):
+    """Places API가 오류 상태를 반환함"""
+
+
+def compact_place(place):
+    """검색 결과 하나에서 PLACE_FIELDS와 좌표만 남긴 dict 반환 (사진, 영업시간 등은 버림)"""
+    compact = {field: place[field] for field in PLACE_FIELDS if field in place}
+    location = place['geometry']['location']
+    compact['geometry'] = {'location': {'lat': location['lat'], 'lng': location['lng']}}
+    return compact
+
+
+def haversine(lat, lon, lats, lngs):
+    """기준 좌표에서 여러 좌표까지의 거리 (m, NumPy 배열 연산)"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def rank_restaurants(restaurants, lat, lon, radius):
+    """거리, 평점(리뷰 수로 보정), 리뷰 수를 합친 점수로 음식점 정렬
+
+    각 결과에 distance_m(현재 위치까지 거리)을 추가한 사본을 반환
+    """
+    if not restaurants:
+        return []
+    lats = np.fromiter((r['geometry']['location']['lat'] for r in restaurants), float, len(restaurants))
+    lngs = np.fromiter((r['geometry']['location']['lng'] for r in restaurants), float, len(restaurants))
+    ratings = np.fromiter((r.get('rating') or 0.0 for r in restaurants), float, len(restaurants))
+    reviews = np.fromiter((r.get('user_ratings_total') or 0 for r in restaurants), float, len(restaurants))
+
+    distances = haversine(lat, lon, lats, lngs)
+    distance_score = 1 - np.minimum(distances / radius, 1)
+    # 리뷰가 적을수록 기준 평점 쪽으로 보정한 베이지안 평균
+    rating_score = (ratings * reviews + RATING_PRIOR * RATING_PRIOR_COUNT) / (reviews + RATING_PRIOR_COUNT) / 5
+    review_score = np.log1p(reviews) / max(np.log1p(reviews.max()), 1)
+    scores = DISTANCE_WEIGHT * distance_score + RATING_WEIGHT * rating_score + REVIEW_WEIGHT * review_score
+
+    order = np.argsort(-scores, kind='stable')
+    return [dict(restaurants[i], distance_m=float(distances[i])) for i in order]
+
+
+class RestaurantSearch:
+    """여러 메뉴를 동시에 검색하고 place_id로 합쳐 순위를 매기는 음식점 검색 엔진
+
+    메뉴/위치 격자/반경별 검색 결과는 cache에 저장하여 세션 간에 재사용
+    (첫 페이지를 먼저 저장하고 나머지 페이지는 백그라운드에서 채움)
+    """
+
+    def __init__(self, client, cache, grid, language='ko', url=PLACES_NEARBY_URL):
+        self.client = client
+        self.cache = cache
+        self.grid = grid
+        self.language = language
+        self.url = url
+        self._executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="places")
+        self._pager = ThreadPoolExecutor(max_workers=PAGE_WORKERS, thread_name_prefix="places-pages")
+
+    def cache_key(self, keyword, lat, lon, radius):
+        """메뉴 정규화 및 위치 격자 반올림으로 검색 캐시 키 생성"""
+        return (
+            "".join(keyword.split()).lower(),
+            round(lat / self.grid),
+            round(lon / self.grid),
+            radius,
+            self.language
+        )
+
+    def _request(self, params):
+        with metrics.timer("places.request"):
+            data = self.client.get_json(self.url, params=params)
+            status = data.get('status')
+            if status not in CACHEABLE_STATUSES:
+                raise PlacesSearchError(f"Places API 오류: {status} {data.get('error_message', '')}".strip())
+        return data
+
+    def _next_page(self, token, api_key):
+        # 다음 페이지 토큰은 발급 직후 잠시 동안 INVALID_REQUEST를 반환함
+        for attempt in range(PAGE_TOKEN_ATTEMPTS):
+            time.sleep(PAGE_TOKEN_DELAY)
+            try:
+                return self._request({'pagetoken': token, 'key': api_key})
+            except PlacesSearchError:
+                if attempt == PAGE_TOKEN_ATTEMPTS - 1:
+                    raise
+        return None
+
+    def fetch_keyword(self, keyword, lat, lon, radius, api_key):
+        """메뉴 하나의 검색 결과를 가져옴 (캐시 우선, 같은 검색은 한 번만 요청)
+
+        첫 페이지만 바로 반환하고, 다음 페이지는 토큰마다 PAGE_TOKEN_DELAY초를 기다려야 하므로
+        백그라운드에서 이어 받아 캐시 항목을 채움 (다음 검색부터 모든 페이지 사용)
+        """
+        key = self.cache_key(keyword, lat, lon, radius)
+        next_token = None
+
+        def first_page():
+            nonlocal next_token
+            data = self._request({
+                'location': f'{lat},{lon}',
+                'radius': str(radius),
+                'type': 'restaurant',
+                'keyword': keyword,
+                'language': self.language,
+                'key': api_key
+            })
+            next_token = data.get('next_page_token')
+            return [compact_place(place) for place in data.get('results', [])]
+
+        results = self.cache.get_or_compute(key, first_page)
+        # 이번 호출이 첫 페이지를 받아 캐시에 저장한 경우에만 나머지 페이지 요청
+        if next_token:
+            self._pager.submit(self._fill_pages, key, next_token, results, api_key)
+        return results
+
+    def _fill_pages(self, key, token, results, api_key):
+        pages = 1
+        try:
+            while token and pages < MAX_PAGES:
+                data = self._next_page(token, api_key)
+                results = results + [compact_place(place) for place in data.get('results', [])]
+                token = data.get('next_page_token')
+                pages += 1
+        except Exception:
+            metrics.error("places.next_page")
+        if pages > 1:
+            self.cache.set(key, results)
+
+    def _fetch_merged(self, keywords, lat, lon, radius, api_key):
+        if len(keywords) == 1:
+            # 검색어가 하나면 다른 세션과 공유하는 작업 풀에서 기다리지 않고 바로 요청
+            batches = [self.fetch_keyword(keywords[0], lat, lon, radius, api_key)]
+        else:
+            futures = [
+                self._executor.submit(self.fetch_keyword, keyword, lat, lon, radius, api_key)
+                for keyword in keywords
+            ]
+            batches, errors = [], []
+            for future in futures:
+                try:
+                    batches.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+            # 모든 메뉴의 검색이 실패한 경우에만 오류로 처리
+            if not batches:
+                raise errors[0]
+        merged = {}
+        for results in batches:
+            for result in results:
+                merged.setdefault(result.get('place_id') or result['name'], result)
+        return list(merged.values())
+
+    def search(self, keywords, lat, lon, api_key, limit=5, radii=SEARCH_RADII, min_results=MIN_RESULTS):
+        """여러 메뉴를 동시에 검색해 중복을 제거하고 순위가 높은 음식점 limit개 반환
+
+        결과가 min_results개보다 적으면 다음 반경으로 넓혀 다시 검색
+        """
+        keywords = [k for k in dict.fromkeys(keywords) if k]
+        if not keywords:
+            return []
+        for radius in radii:
+            candidates = self._fetch_merged(keywords, lat, lon, radius, api_key)
+            if len(candidates) >= min_results:
+                break
+        return rank_restaurants(candidates, lat, lon, radius)[:limit]
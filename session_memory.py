@@ -0,0 +1,144 @@
+"""세션별 메모리 관리 (간결한 메시지 레코드, 저장 턴 수 제한, 유휴 세션 파생 캐시 정리, 메모리 보고)"""
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, fields, is_dataclass
+
+
+@dataclass(slots=True)
+class ChatMessage:
+    """채팅 기록 메시지 하나 (인스턴스 __dict__ 없이 필요한 필드만 보관)"""
+    content: str
+    is_user: bool
+    recommended_menu: str | None = None
+    nutrient_gaps: tuple[str, ...] = ()
+    advice: str | None = None
+    menu_ranking: tuple[str, ...] | None = None  # 로컬 점수 순으로 정렬한 후보 메뉴
+    prompt_tokens: int | None = None  # 이번 턴에 모델에 보낸 프롬프트 크기 (추정치)
+
+    def to_dict(self):
+        """JSON으로 저장할 수 있는 dict로 변환 (공유 캐시 저장용)"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict 결과(또는 JSON으로 왕복한 값)에서 복원"""
+        values = {f.name: data[f.name] for f in fields(cls) if f.name in data}
+        for name in ('nutrient_gaps', 'menu_ranking'):
+            if isinstance(values.get(name), list):
+                values[name] = tuple(values[name])
+        return cls(**values)
+
+
+def trim_history(messages, max_turns):
+    """오래된 턴을 지워 최근 max_turns턴만 남기고 지운 메시지 수 반환
+
+    남은 기록이 항상 사용자 메시지로 시작하도록 턴 단위로 지움
+    """
+    excess = len(messages) - max_turns * 2
+    if excess <= 0:
+        return 0
+    while excess < len(messages) and not messages[excess].is_user:
+        excess += 1
+    del messages[:excess]
+    return excess
+
+
+def deep_size(obj, seen=None):
+    """객체와 그 안에 담긴 컨테이너/문자열/데이터클래스 필드의 메모리 크기 추정 (바이트)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        size += sum(deep_size(getattr(obj, f.name), seen) for f in fields(obj))
+    elif hasattr(obj, '__dict__'):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+class _Session:
+    __slots__ = ('last_seen', 'derived', 'state_bytes')
+
+    def __init__(self, now):
+        self.last_seen = now
+        self.derived = {}
+        self.state_bytes = 0
+
+
+class SessionRegistry:
+    """프로세스 내 세션별 파생 캐시(대화 세션 등)와 메모리 사용량 기록
+
+    파생 캐시는 채팅 기록에서 다시 만들 수 있는 값만 보관하며,
+    idle_timeout초 동안 재실행이 없는 세션의 항목은 백그라운드 스레드가 주기적으로 지움
+    """
+
+    def __init__(self, idle_timeout, sweep_interval):
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self._stop = threading.Event()
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, args=(sweep_interval,), name="session-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def _entry(self, session_id):
+        now = time.monotonic()
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._sessions[session_id] = _Session(now)
+        entry.last_seen = now
+        return entry
+
+    def derived(self, session_id):
+        """세션의 파생 캐시 dict 반환 (호출 시점을 마지막 사용 시각으로 기록)"""
+        with self._lock:
+            return self._entry(session_id).derived
+
+    def record_size(self, session_id, state_bytes):
+        """세션 상태의 메모리 사용량(바이트) 기록"""
+        with self._lock:
+            self._entry(session_id).state_bytes = state_bytes
+
+    def sweep(self):
+        """유휴 세션의 기록과 파생 캐시를 지우고 지운 세션 수 반환"""
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [sid for sid, entry in self._sessions.items() if entry.last_seen < deadline]
+            for sid in idle:
+                del self._sessions[sid]
+            self.evicted += len(idle)
+        return len(idle)
+
+    def _sweep_loop(self, interval):
+        while not self._stop.wait(interval):
+            self.sweep()
+
+    def close(self):
+        """정리 스레드 종료"""
+        self._stop.set()
+
+    def report(self):
+        """세션별 유휴 시간, 기록된 세션 상태 크기, 파생 캐시 크기 목록 (큰 세션부터)"""
+        now = time.monotonic()
+        with self._lock:
+            sessions = list(self._sessions.items())
+        rows = [{
+            'session_id': sid,
+            'idle_seconds': now - entry.last_seen,
+            'state_bytes': entry.state_bytes,
+            'derived_bytes': deep_size(entry.derived),
+        } for sid, entry in sessions]
+        return sorted(rows, key=lambda r: r['state_bytes'] + r['derived_bytes'], reverse=True)
+
+    def stats(self):
+        """활성 세션 수와 지금까지 정리한 세션 수"""
+        with self._lock:
+            return {'sessions': len(self._sessions), 'evicted': self.evicted}
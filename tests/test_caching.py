@@ -0,0 +1,148 @@
+import multiprocessing
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import caching
+from caching import MemoryCache, SQLiteCache
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(caching, "time", SimpleNamespace(time=clock, monotonic=clock, sleep=time.sleep))
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(maxsize=10, ttl=60):
+        if request.param == "sqlite":
+            return SQLiteCache(str(tmp_path / "cache.sqlite3"), "test", maxsize=maxsize, ttl=ttl)
+        return MemoryCache(maxsize=maxsize, ttl=ttl)
+    return make
+
+
+def test_entries_expire_after_ttl(make_cache, clock):
+    cache = make_cache(ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=10)
+    clock.advance(30)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    clock.advance(31)
+    assert cache.get("a") is None
+
+
+def test_get_or_compute_propagates_errors_without_storing(make_cache):
+    cache = make_cache()
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError, match="upstream down"):
+        cache.get_or_compute("key", fail)
+    assert cache.get("key") is None
+    # 실패한 계산이 잠금을 남기지 않아 다음 계산이 바로 실행됨
+    assert cache.get_or_compute("key", lambda: {"ok": True}) == {"ok": True}
+
+
+def test_sqlite_evicts_least_recently_used_beyond_maxsize(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(caching, "ACCESS_RESOLUTION", 0)
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), "test", maxsize=3, ttl=600)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        clock.advance(1)
+    assert cache.get("a") == "a"
+    clock.advance(1)
+    cache.set("d", "d")
+    assert cache.size() == 3
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+
+
+def test_sqlite_size_stays_bounded(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), "test", maxsize=3, ttl=600)
+    for i in range(40):
+        cache.set(f"key{i}", i)
+    assert cache.size() == 3
+
+
+def test_sqlite_hits_refresh_access_time_lazily(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), "test", maxsize=10, ttl=600)
+    cache.set("a", 1)
+
+    def accessed():
+        return cache._conn.execute("SELECT accessed FROM cache WHERE key = ?", ('"a"',)).fetchone()[0]
+
+    written = accessed()
+    clock.advance(caching.ACCESS_RESOLUTION / 2)
+    assert cache.get("a") == 1
+    assert accessed() == written
+    clock.advance(caching.ACCESS_RESOLUTION)
+    assert cache.get("a") == 1
+    assert accessed() == clock.now
+
+
+def _compute_once(path, marker, results):
+    cache = SQLiteCache(path, "test", maxsize=10, ttl=60)
+
+    def compute():
+        with open(marker, "a") as f:
+            f.write("x")
+        time.sleep(0.5)
+        return {"value": 42}
+
+    results.put(cache.get_or_compute("key", compute))
+
+
+def test_sqlite_lease_computes_once_across_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    path, marker = str(tmp_path / "cache.sqlite3"), tmp_path / "computed"
+    SQLiteCache(path, "test", maxsize=10, ttl=60)  # 스키마를 미리 만들어 프로세스 간 생성 경합 방지
+    results = context.Queue()
+    workers = [context.Process(target=_compute_once, args=(path, str(marker), results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+    assert [results.get(timeout=1) for _ in workers] == [{"value": 42}] * 3
+    assert marker.read_text() == "x"
+
+
+def test_sqlite_lease_is_renewed_while_computing(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "LOCK_TTL", 0.3)
+    path = str(tmp_path / "cache.sqlite3")
+    caches = [SQLiteCache(path, "test", maxsize=10, ttl=60) for _ in range(2)]
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        time.sleep(1)
+        return len(calls)
+
+    def worker(cache):
+        results.append(cache.get_or_compute("slow", compute))
+
+    threads = [threading.Thread(target=worker, args=(cache,)) for cache in caches]
+    threads[0].start()
+    time.sleep(0.1)
+    threads[1].start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert len(calls) == 1
+    assert results == [1, 1]
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+import http_client
+from http_client import HttpClient
+
+
+class FakeAdapter(BaseAdapter):
+    """미리 정한 상태 코드(또는 예외)를 차례로 돌려주고 받은 요청을 기록하는 어댑터"""
+
+    def __init__(self, *outcomes):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.calls.append({'url': request.url, 'timeout': timeout})
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response._content = json.dumps({'status': 'OK' if outcome == 200 else 'ERROR'}).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF_INITIAL", 0)
+    monkeypatch.setattr(http_client, "BACKOFF_MAX", 0)
+
+
+def test_retries_transient_status_then_succeeds():
+    adapter = FakeAdapter(503, 200)
+    client = HttpClient(transport=adapter)
+    assert client.get_json("https://example.test/places") == {'status': 'OK'}
+    assert len(adapter.calls) == 2
+
+
+def test_retries_connection_errors():
+    adapter = FakeAdapter(requests.ConnectionError("reset"), 200)
+    client = HttpClient(transport=adapter)
+    assert client.get("https://example.test/places").status_code == 200
+    assert len(adapter.calls) == 2
+
+
+def test_raises_after_max_attempts():
+    adapter = FakeAdapter(503)
+    client = HttpClient(transport=adapter, max_attempts=3)
+    with pytest.raises(requests.HTTPError) as excinfo:
+        client.get("https://example.test/places")
+    assert excinfo.value.response.status_code == 503
+    assert len(adapter.calls) == 3
+
+
+def test_does_not_retry_client_errors():
+    adapter = FakeAdapter(404)
+    client = HttpClient(transport=adapter)
+    with pytest.raises(requests.HTTPError):
+        client.get_json("https://example.test/places")
+    assert len(adapter.calls) == 1
+
+
+def test_passes_timeout_to_transport():
+    adapter = FakeAdapter(200)
+    client = HttpClient(transport=adapter, timeout=(1.5, 4))
+    client.get("https://example.test/places")
+    client.get("https://example.test/places", timeout=0.5)
+    assert [call['timeout'] for call in adapter.calls] == [(1.5, 4), 0.5]
+
+
+def test_default_timeout_uses_connect_and_read_limits():
+    adapter = FakeAdapter(200)
+    HttpClient(transport=adapter).get("http://example.test/reverse")
+    assert adapter.calls[0]['timeout'] == (http_client.CONNECT_TIMEOUT, http_client.READ_TIMEOUT)
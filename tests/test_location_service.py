@@ -0,0 +1,61 @@
+import json
+
+import pytest
+import requests
+from geopy.exc import GeocoderServiceError
+from requests.adapters import BaseAdapter
+
+import http_client
+import location_service
+from http_client import HttpClient
+from location_service import LocationService
+
+
+class NominatimAdapter(BaseAdapter):
+    """Nominatim reverse 응답을 흉내 내는 전송 어댑터 (상태 코드를 차례로 사용)"""
+
+    def __init__(self, *statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.calls.append({'url': request.url, 'timeout': timeout, 'user_agent': request.headers.get('User-Agent')})
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        response = requests.Response()
+        response.status_code = status
+        body = {'place_id': 1, 'lat': "37.5665", 'lon': "126.978", 'display_name': "서울특별시 중구 세종대로 110"}
+        response._content = json.dumps(body if status == 200 else {'error': "unavailable"}).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fast(monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF_INITIAL", 0)
+    monkeypatch.setattr(http_client, "BACKOFF_MAX", 0)
+    monkeypatch.setattr(location_service, "GEOCODE_MIN_INTERVAL", 0)
+
+
+def test_reverse_goes_through_shared_client_with_retries():
+    adapter = NominatimAdapter(503, 200)
+    service = LocationService(client=HttpClient(transport=adapter))
+    assert service.reverse(37.5665, 126.978) == "서울특별시 중구 세종대로 110"
+    assert len(adapter.calls) == 2
+    assert adapter.calls[0]['timeout'] == location_service.GEOCODE_TIMEOUT
+    assert adapter.calls[0]['user_agent'] == location_service.GEOCODER_USER_AGENT
+    # 같은 좌표는 다시 요청하지 않고 캐시에서 반환
+    assert service.reverse(37.5665, 126.978) == "서울특별시 중구 세종대로 110"
+    assert len(adapter.calls) == 2
+
+
+def test_reverse_maps_client_errors_to_geopy_errors():
+    adapter = NominatimAdapter(403)
+    service = LocationService(client=HttpClient(transport=adapter))
+    with pytest.raises(GeocoderServiceError):
+        service.reverse(37.5665, 126.978)
+    assert len(adapter.calls) == 1
@@ -0,0 +1,46 @@
+import json
+
+from recommendation import EMPTY_REPLY, extract_partial_reply, parse_response, to_model_text
+
+
+def test_valid_json_is_not_a_fallback():
+    text = json.dumps({"reply": "좋아요", "nutrient_gaps": ["단백질"], "recommended_menu": "<b>비빔밥</b>"})
+    advice = parse_response(text)
+    assert advice.reply == "좋아요"
+    assert advice.recommended_menu == "비빔밥"
+    assert not advice.fallback
+
+
+def test_truncated_json_shows_partial_reply_instead_of_raw_json():
+    advice = parse_response('{"reply": "단백질이 부족해 보여요.\\n추천메뉴: 된장찌개", "nutrient_gaps": ["단')
+    assert advice.reply == "단백질이 부족해 보여요.\n추천메뉴: 된장찌개"
+    assert advice.nutrient_gaps == ["단백질"]
+    assert advice.recommended_menu == "된장찌개"
+    assert advice.fallback
+
+
+def test_null_required_field_keeps_readable_fields():
+    advice = parse_response('{"reply": "좋아요", "nutrient_gaps": null, "recommended_menu": "비빔밥"}')
+    assert (advice.reply, advice.nutrient_gaps, advice.recommended_menu) == ("좋아요", [], "비빔밥")
+    assert advice.fallback
+
+
+def test_json_without_reply_uses_placeholder():
+    assert parse_response('{"nutrient_gaps": [').reply == EMPTY_REPLY
+
+
+def test_plain_text_reply_is_kept():
+    advice = parse_response("철분이 부족해요.\n추천메뉴: 순대국")
+    assert advice.reply.startswith("철분이 부족해요.")
+    assert advice.recommended_menu == "순대국"
+    assert advice.fallback
+
+
+def test_partial_reply_drops_incomplete_escapes():
+    assert extract_partial_reply('{"reply": "안녕\\u00') == "안녕"
+    assert extract_partial_reply("그냥 텍스트") == "그냥 텍스트"
+
+
+def test_model_text_round_trips():
+    record = parse_response(json.dumps({"reply": "좋아요", "nutrient_gaps": ["철분"]})).to_record()
+    assert parse_response(to_model_text(record)).to_record() == record
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+import restaurant_search
+from caching import MemoryCache
+from restaurant_search import RestaurantSearch
+
+LAT, LON = 37.5665, 126.9780
+
+
+class FakePlacesClient:
+    """검색어마다 pages 페이지(페이지당 per_page개)를 돌려주는 Places 대체 클라이언트"""
+
+    def __init__(self, pages=1, per_page=20):
+        self.pages = pages
+        self.per_page = per_page
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get_json(self, url, params):
+        with self._lock:
+            self.requests.append(params)
+        if 'pagetoken' in params:
+            keyword, page = params['pagetoken'].rsplit(":", 1)
+            page = int(page)
+        else:
+            keyword, page = params['keyword'], 0
+        data = {'status': 'OK', 'results': [{
+            'place_id': f"{keyword}_{page}_{i}",
+            'name': f"{keyword} {page}-{i}",
+            'rating': 4.0,
+            'user_ratings_total': 10,
+            'vicinity': "서울",
+            'geometry': {'location': {'lat': LAT, 'lng': LON}},
+        } for i in range(self.per_page)]}
+        if page + 1 < self.pages:
+            data['next_page_token'] = f"{keyword}:{page + 1}"
+        return data
+
+
+@pytest.fixture(autouse=True)
+def no_page_delay(monkeypatch):
+    monkeypatch.setattr(restaurant_search, "PAGE_TOKEN_DELAY", 0)
+
+
+def make_engine(client):
+    return RestaurantSearch(client, MemoryCache(maxsize=100, ttl=600), grid=0.005)
+
+
+def test_first_search_returns_after_one_request_and_fills_pages_in_background():
+    client = FakePlacesClient(pages=3)
+    engine = make_engine(client)
+    assert len(engine.fetch_keyword("비빔밥", LAT, LON, 1000, "key")) == 20
+    engine._pager.shutdown(wait=True)
+    assert len(client.requests) == 3
+    cached = engine.cache.get(engine.cache_key("비빔밥", LAT, LON, 1000))
+    assert len(cached) == 60
+    assert len(engine.fetch_keyword("비빔밥", LAT, LON, 1000, "key")) == 60
+    assert len(client.requests) == 3
+
+
+def test_search_merges_keywords_and_limits_results():
+    client = FakePlacesClient()
+    engine = make_engine(client)
+    results = engine.search(["비빔밥", "순대국", "비빔밥"], LAT, LON, "key", limit=5)
+    assert len(results) == 5
+    assert sorted(p['keyword'] for p in client.requests) == ["비빔밥", "순대국"]
+
+
+def test_search_widens_radius_when_results_are_few():
+    client = FakePlacesClient(per_page=2)
+    engine = make_engine(client)
+    engine.search(["비빔밥"], LAT, LON, "key", radii=(1000, 2000), min_results=5)
+    assert [p['radius'] for p in client.requests] == ["1000", "2000"]